@@ -0,0 +1,404 @@
+"""
+Measures `WeatherService.send_weather_update_to_users` end to end, against a seeded Postgres and the local
+Telegram Bot API and data.gov.sg stand-ins of `benchmarks/stand_ins.py`.
+
+For every subscriber count the database is reseeded and one broadcast runs in a fresh process, reporting
+messages per second, p50/p99 latency of a send, peak RSS of that process and time spent in the database.
+Results are compared against `benchmarks/baselines/broadcast.json`, which `--save-baseline` (re)records.
+
+Tables of the `--database` database are dropped and recreated, it must not hold anything worth keeping. The
+broadcast rate limit is lifted by default so the numbers reflect the broadcast path rather than the limiter.
+
+Usage (from the backend directory, with the POSTGRES_* settings pointing at a server that has the database):
+    python -m benchmarks.broadcast --subscribers 1000 10000 100000 1000000
+    python -m benchmarks.broadcast --subscribers 10000 --error-429-rate 0.01 --save-baseline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import pathlib
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Callable, List
+from pydantic import BaseModel
+from benchmarks.stand_ins import (
+    FakeOpenGovConfig,
+    FakeTelegramConfig,
+    create_fake_open_gov_app,
+    create_fake_telegram_app,
+    serve_in_background,
+)
+
+BASELINE_PATH = pathlib.Path(__file__).parent / "baselines" / "broadcast.json"
+BOT_TOKEN = "123456:benchmark"
+# one in six subscribers is alerted for all of Singapore, the others for one of the five regions
+SEED_REGIONS = "ARRAY[NULL, 'west', 'east', 'central', 'south', 'north']"
+
+
+class BroadcastBenchmarkOptions(BaseModel):
+    workers: int
+    rate_per_second: float
+    telegram_base_url: str
+    telegram: FakeTelegramConfig
+
+
+class BroadcastBenchmarkResult(BaseModel):
+    subscribers: int
+    messages: int
+    sent: int
+    failed: int
+    retried: int
+    duration_seconds: float
+    messages_per_second: float
+    p50_send_ms: float
+    p99_send_ms: float
+    peak_rss_mb: float
+    db_statements: int
+    # time spent executing statements, not counting rows fetched from the recipient cursor afterwards
+    db_execute_seconds: float
+    # time the broadcast waited on recipient batches, cursor fetches and row mapping included
+    recipient_stream_seconds: float
+
+
+class TimedBot:
+    """
+    Forwards `send_message` to a `Bot` and records the latency of every call, failed ones included.
+    """
+
+    def __init__(self, bot: Any):
+        self.bot = bot
+        self.latencies: List[float] = []
+
+    async def send_message(self, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await self.bot.send_message(**kwargs)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+class StatementTimer:
+    """
+    Counts the statements run through an engine and the time spent executing them.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.execute_seconds = 0.0
+
+    def before_cursor_execute(self, conn, *_):
+        conn.info.setdefault("benchmark_started_at", []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, *_):
+        self.statements += 1
+        self.execute_seconds += (
+            time.perf_counter() - conn.info["benchmark_started_at"].pop()
+        )
+
+
+def _timed_stream(
+    stream: Callable[..., AsyncIterator[List[Any]]], timings: List[float]
+) -> Callable[..., AsyncIterator[List[Any]]]:
+    async def wrapper(*args, **kwargs):
+        async with contextlib.aclosing(stream(*args, **kwargs)) as batches:
+            while True:
+                start = time.perf_counter()
+                try:
+                    batch = await anext(batches)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    timings.append(time.perf_counter() - start)
+                yield batch
+
+    return wrapper
+
+
+def percentile_ms(values: List[float], percentile: int) -> float:
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[percentile - 1] * 1000
+
+
+def _peak_rss_mb() -> float:
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed_subscribers(subscribers: int):
+    """
+    Recreates every table and inserts `subscribers` users, all due for alerts at any time of day.
+    """
+    from sqlalchemy import text
+    from src.core.sql import SQLBase, async_engine
+    from src.models import broadcast, forecast, preferences, telegram  # noqa: F401
+
+    async with async_engine.begin() as connection:
+        await connection.run_sync(SQLBase.metadata.drop_all)
+        await connection.run_sync(SQLBase.metadata.create_all)
+        await connection.execute(
+            text(
+                """
+                INSERT INTO telegram (user_id, chat_id, username, first_name, last_name, is_deleted, updated_at)
+                SELECT i::text, i::text, 'user' || i, 'First', 'Last', false, now()
+                FROM generate_series(1, :subscribers) AS i
+                """
+            ),
+            {"subscribers": subscribers},
+        )
+        # alert windows span the whole day, every subscriber is due
+        await connection.execute(
+            text(
+                f"""
+                INSERT INTO preferences (id, alert_start_time, alert_end_time, utc_offset_minutes, region)
+                SELECT i::text, '00:00:00', '23:59:59.999999', 480, ({SEED_REGIONS})[i % 6 + 1]
+                FROM generate_series(1, :subscribers) AS i
+                """
+            ),
+            {"subscribers": subscribers},
+        )
+    async with async_engine.connect() as connection:
+        await connection.execute(text("ANALYZE"))
+
+
+async def _run(
+    subscribers: int, options: BroadcastBenchmarkOptions
+) -> BroadcastBenchmarkResult:
+    # settings are read from the environment on import, which `main` prepared before starting this process
+    from sqlalchemy import event
+    from telegram import Bot
+    from telegram.request import HTTPXRequest
+    from src.core.fetch import close_async_client
+    from src.core.sql import async_engine
+    from src.microservices.weather_bot.services.weather import WeatherService
+    from src.microservices.weather_bot.utils.broadcast import BroadcastEngine
+
+    await seed_subscribers(subscribers)
+
+    timer = StatementTimer()
+    event.listen(
+        async_engine.sync_engine, "before_cursor_execute", timer.before_cursor_execute
+    )
+    event.listen(
+        async_engine.sync_engine, "after_cursor_execute", timer.after_cursor_execute
+    )
+
+    bot = TimedBot(
+        Bot(
+            BOT_TOKEN,
+            base_url=options.telegram_base_url,
+            request=HTTPXRequest(connection_pool_size=options.workers),
+        )
+    )
+    await bot.bot.initialize()
+    service = WeatherService(
+        broadcast_engine=BroadcastEngine(
+            rate_per_second=options.rate_per_second,
+            workers=options.workers,
+            per_chat_interval_seconds=options.telegram.per_chat_interval_seconds,
+        )
+    )
+    stream_timings: List[float] = []
+    service.telegram_repo.stream_subscribed_users_within_timeframe = _timed_stream(
+        service.telegram_repo.stream_subscribed_users_within_timeframe,
+        stream_timings,
+    )
+    summaries = []
+    broadcast = service.broadcast_engine.broadcast
+
+    async def recorded_broadcast(*args, **kwargs):
+        summary = await broadcast(*args, **kwargs)
+        summaries.append(summary)
+        return summary
+
+    service.broadcast_engine.broadcast = recorded_broadcast
+
+    start = time.perf_counter()
+    try:
+        await service.send_weather_update_to_users(types.SimpleNamespace(bot=bot))
+    finally:
+        duration_seconds = time.perf_counter() - start
+        await bot.bot.shutdown()
+        await close_async_client()
+        await async_engine.dispose()
+
+    sent = sum(summary.sent for summary in summaries)
+    return BroadcastBenchmarkResult(
+        subscribers=subscribers,
+        messages=sum(summary.total for summary in summaries),
+        sent=sent,
+        failed=sum(summary.failed for summary in summaries),
+        retried=sum(summary.retried for summary in summaries),
+        duration_seconds=duration_seconds,
+        messages_per_second=sent / duration_seconds,
+        p50_send_ms=percentile_ms(bot.latencies, 50),
+        p99_send_ms=percentile_ms(bot.latencies, 99),
+        peak_rss_mb=_peak_rss_mb(),
+        db_statements=timer.statements,
+        db_execute_seconds=timer.execute_seconds,
+        recipient_stream_seconds=sum(stream_timings),
+    )
+
+
+def run_broadcast(
+    subscribers: int, options: BroadcastBenchmarkOptions
+) -> BroadcastBenchmarkResult:
+    return asyncio.run(_run(subscribers, options))
+
+
+def load_baseline() -> dict:
+    if not BASELINE_PATH.is_file():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())
+
+
+def save_baseline(
+    options: BroadcastBenchmarkOptions, results: List[BroadcastBenchmarkResult]
+):
+    baseline = load_baseline()
+    if baseline.get("options") != options.model_dump(exclude={"telegram_base_url"}):
+        baseline = {}
+    baseline["options"] = options.model_dump(exclude={"telegram_base_url"})
+    baseline.setdefault("results", {}).update(
+        {str(result.subscribers): result.model_dump() for result in results}
+    )
+    BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def find_regressions(
+    options: BroadcastBenchmarkOptions,
+    results: List[BroadcastBenchmarkResult],
+    tolerance: float,
+) -> List[str]:
+    baseline = load_baseline()
+    if not baseline:
+        return []
+    if baseline["options"] != options.model_dump(exclude={"telegram_base_url"}):
+        print("Baseline was recorded with different options, skipping comparison")
+        return []
+    regressions = []
+    for result in results:
+        expected = baseline["results"].get(str(result.subscribers))
+        if not expected:
+            continue
+        # (metric, True if higher is better)
+        for metric, higher_is_better in (
+            ("messages_per_second", True),
+            ("p99_send_ms", False),
+            ("peak_rss_mb", False),
+        ):
+            actual, reference = getattr(result, metric), expected[metric]
+            change = (actual - reference) / reference if reference else 0.0
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(
+                    f"{result.subscribers} subscribers: {metric} {reference:.1f} -> {actual:.1f} "
+                    f"({change:+.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--subscribers", type=int, nargs="+", default=[1000, 10000, 100000, 1000000]
+    )
+    parser.add_argument("--database", default="alerts_benchmark")
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--rate-per-second", type=float, default=1_000_000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-429-rate", type=float, default=0.0)
+    parser.add_argument("--per-chat-interval-seconds", type=float, default=1.0)
+    parser.add_argument("--telegram-port", type=int, default=8181)
+    parser.add_argument("--open-gov-port", type=int, default=8182)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="relative change from the baseline reported as a regression",
+    )
+    args = parser.parse_args()
+
+    options = BroadcastBenchmarkOptions(
+        workers=args.workers,
+        rate_per_second=args.rate_per_second,
+        telegram_base_url=f"http://127.0.0.1:{args.telegram_port}/bot",
+        telegram=FakeTelegramConfig(
+            latency_seconds=args.latency_ms / 1000,
+            latency_jitter_seconds=args.jitter_ms / 1000,
+            error_429_rate=args.error_429_rate,
+            per_chat_interval_seconds=args.per_chat_interval_seconds,
+        ),
+    )
+    archive_dir = tempfile.TemporaryDirectory()
+    # inherited by the benchmark processes, which import the settings
+    os.environ.update(
+        {
+            "POSTGRES_DB": args.database,
+            "OPEN_GOV_ENDPOINT": f"http://127.0.0.1:{args.open_gov_port}",
+            "TELEGRAM_BOT_TOKEN": BOT_TOKEN,
+            "CACHE_BACKEND": "memory",
+            "FORECAST_ARCHIVE_BACKEND": "local",
+            "FORECAST_ARCHIVE_LOCAL_DIR": archive_dir.name,
+            "BROADCAST_SHARD_COUNT": "1",
+        }
+    )
+
+    stand_ins = [
+        serve_in_background(
+            create_fake_telegram_app, options.telegram, args.telegram_port
+        ),
+        serve_in_background(
+            create_fake_open_gov_app, FakeOpenGovConfig(), args.open_gov_port
+        ),
+    ]
+    results: List[BroadcastBenchmarkResult] = []
+    try:
+        print(
+            f"{'subscribers':>11} {'messages':>9} {'failed':>7} {'retried':>8} {'msgs/s':>9} "
+            f"{'p50 (ms)':>9} {'p99 (ms)':>9} {'rss (MB)':>9} {'db stmts':>9} "
+            f"{'db exec (s)':>12} {'stream (s)':>11}"
+        )
+        for subscribers in args.subscribers:
+            # a fresh process per run, so peak RSS and caches belong to that run alone
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                result = executor.submit(run_broadcast, subscribers, options).result()
+            results.append(result)
+            print(
+                f"{result.subscribers:>11} {result.messages:>9} {result.failed:>7} "
+                f"{result.retried:>8} {result.messages_per_second:>9.1f} "
+                f"{result.p50_send_ms:>9.1f} {result.p99_send_ms:>9.1f} "
+                f"{result.peak_rss_mb:>9.1f} {result.db_statements:>9} "
+                f"{result.db_execute_seconds:>12.3f} {result.recipient_stream_seconds:>11.3f}"
+            )
+    finally:
+        for process in stand_ins:
+            process.terminate()
+        archive_dir.cleanup()
+
+    if args.save_baseline:
+        save_baseline(options, results)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return
+    regressions = find_regressions(options, results, args.tolerance)
+    for regression in regressions:
+        print(f"Regression - {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compares decoding a data.gov.sg response with `json.loads` + `Schema(**data)`, as the connector used to, against
+validating the raw bytes in a single pass with `Schema.model_validate_json`.
+
+Payloads are the fixtures in `benchmarks/fixtures`, with the record list repeated `--records` times to mimic
+larger responses such as a full day of forecasts.
+
+Samples of both decoders are taken in turn, so drift of the machine affects both alike, and each payload reports
+the median speedup of the paired samples together with the lowest and highest. A range that includes 1.0x means
+no difference could be measured for that payload, not a speedup.
+
+Usage (from the backend directory):
+    python -m benchmarks.decode --records 1 50 500
+"""
+
+import argparse
+import json
+import pathlib
+import statistics
+import timeit
+from typing import Callable, List, Tuple, Type
+from pydantic import BaseModel
+from src.schemas.weather import FourDayOutlookSchema, TwentyFourHourSchema
+
+FIXTURES_DIR = pathlib.Path(__file__).parent / "fixtures"
+PAYLOADS: dict[str, Type[BaseModel]] = {
+    "twenty_four_hour_forecast.json": TwentyFourHourSchema,
+    "four_day_outlook.json": FourDayOutlookSchema,
+}
+
+
+def load_payload(name: str, records: int) -> bytes:
+    payload = json.loads((FIXTURES_DIR / name).read_bytes())
+    payload["data"]["records"] = payload["data"]["records"] * records
+    return json.dumps(payload).encode()
+
+
+def kwargs_decode(schema: Type[BaseModel], body: bytes) -> BaseModel:
+    return schema(**json.loads(body))
+
+
+def bytes_decode(schema: Type[BaseModel], body: bytes) -> BaseModel:
+    return schema.model_validate_json(body)
+
+
+def paired_samples(
+    schema: Type[BaseModel], body: bytes, repeat: int
+) -> List[Tuple[float, float]]:
+    """
+    Seconds per decode of `kwargs_decode` and `bytes_decode`, sampled alternately `repeat` times.
+    """
+    # enough iterations for each sample to take a measurable amount of time
+    number = max(1, 200_000 // len(body))
+
+    def sample(func: Callable[[Type[BaseModel], bytes], BaseModel]) -> float:
+        return timeit.timeit(lambda: func(schema, body), number=number) / number
+
+    return [(sample(kwargs_decode), sample(bytes_decode)) for _ in range(repeat)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    print(
+        f"{'payload':>32} {'records':>8} {'bytes':>10} "
+        f"{'kwargs (ms)':>12} {'bytes (ms)':>11} {'speedup':>8} {'range':>12}"
+    )
+    for name, schema in PAYLOADS.items():
+        for records in args.records:
+            body = load_payload(name, records)
+            assert kwargs_decode(schema, body) == bytes_decode(schema, body)
+            samples = paired_samples(schema, body, args.repeat)
+            speedups = [kwargs / bytes_ for kwargs, bytes_ in samples]
+            kwargs_seconds = statistics.median(kwargs for kwargs, _ in samples)
+            bytes_seconds = statistics.median(bytes_ for _, bytes_ in samples)
+            speedup_range = f"{min(speedups):.1f}-{max(speedups):.1f}x"
+            print(
+                f"{name:>32} {records:>8} {len(body):>10} "
+                f"{kwargs_seconds * 1000:>12.3f} {bytes_seconds * 1000:>11.3f} "
+                f"{statistics.median(speedups):>7.1f}x {speedup_range:>12}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares the ORM + pydantic read of `TelegramRepository.list_subscribed_users_within_timeframe` against the lean
+Core + `TelegramRecipient` read of `stream_subscribed_users_within_timeframe`, which the broadcasts use.
+
+Both repository methods are called as shipped, against a Postgres database seeded with `--rows` subscribers who
+are all within their alert window.
+
+Tables of the `--database` database are dropped and recreated, it must not hold anything worth keeping.
+
+Usage (from the backend directory, with the POSTGRES_* settings pointing at a server that has the database):
+    python -m benchmarks.repository_mapping --rows 10000 100000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable
+from benchmarks.broadcast import seed_subscribers
+
+
+async def best_of(func: Callable[[], Awaitable[int]], rows: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert await func() == rows
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+async def run(args: argparse.Namespace):
+    # settings are read from the environment on import, which `main` prepared
+    from src.core.sql import async_engine
+    from src.repository.telegram import TelegramRepository
+
+    repository = TelegramRepository()
+
+    async def orm_pydantic() -> int:
+        return len(await repository.list_subscribed_users_within_timeframe())
+
+    async def core_recipients() -> int:
+        return sum(
+            [
+                len(batch)
+                async for batch in repository.stream_subscribed_users_within_timeframe()
+            ]
+        )
+
+    print(
+        f"{'rows':>10} {'orm+pydantic (s)':>18} {'core+tuple (s)':>16} {'speedup':>8}"
+    )
+    for rows in args.rows:
+        await seed_subscribers(rows)
+        orm_seconds = await best_of(orm_pydantic, rows, args.repeat)
+        core_seconds = await best_of(core_recipients, rows, args.repeat)
+        print(
+            f"{rows:>10} {orm_seconds:>18.3f} {core_seconds:>16.3f} "
+            f"{orm_seconds / core_seconds:>7.1f}x"
+        )
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database", default="alerts_benchmark")
+    args = parser.parse_args()
+
+    os.environ.update({"POSTGRES_DB": args.database, "CACHE_BACKEND": "memory"})
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Local stand-ins for the Telegram Bot API and data.gov.sg, for benchmarks that drive the bot end to end.
+
+Each stand-in is a FastAPI app served from its own process by `serve_in_background`, so it neither competes with
+the measured process for its event loop nor shows up in its memory usage.
+"""
+
+import asyncio
+import datetime
+import itertools
+import json
+import math
+import multiprocessing
+import pathlib
+import random
+import socket
+import time
+import urllib.parse
+from multiprocessing.process import BaseProcess
+from typing import Callable
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from pydantic import BaseModel
+
+FIXTURES_DIR = pathlib.Path(__file__).parent / "fixtures"
+
+
+class FakeTelegramConfig(BaseModel):
+    latency_seconds: float = 0.02
+    latency_jitter_seconds: float = 0.01
+    # share of sendMessage calls answered with a 429 regardless of the chat, as if a global limit was hit
+    error_429_rate: float = 0.0
+    retry_after_seconds: int = 1
+    # Telegram allows about one message per second to the same chat, faster sends are answered with a 429
+    per_chat_interval_seconds: float = 1.0
+    seed: int = 0
+
+
+class FakeOpenGovConfig(BaseModel):
+    latency_seconds: float = 0.05
+
+
+def _json_response(payload: dict, status_code: int = 200) -> Response:
+    return Response(
+        content=json.dumps(payload),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def _too_many_requests(retry_after_seconds: int) -> Response:
+    return _json_response(
+        {
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {retry_after_seconds}",
+            "parameters": {"retry_after": retry_after_seconds},
+        },
+        status_code=429,
+    )
+
+
+async def _request_parameters(request: Request) -> dict:
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("application/json"):
+        return json.loads(body or b"{}")
+    # python-telegram-bot sends parameters form encoded unless files are attached
+    return {
+        name: values[0] for name, values in urllib.parse.parse_qs(body.decode()).items()
+    }
+
+
+def create_fake_telegram_app(config: FakeTelegramConfig) -> FastAPI:
+    """
+    Answers `getMe` and `sendMessage` like the Bot API, every other method succeeds with `true`.
+    """
+    app = FastAPI()
+    rng = random.Random(config.seed)
+    message_ids = itertools.count(1)
+    last_sent_at: dict[str, float] = {}
+
+    @app.post("/bot{token}/{method}")
+    async def bot_api(token: str, method: str, request: Request):
+        parameters = await _request_parameters(request)
+        await asyncio.sleep(
+            max(
+                0.0,
+                config.latency_seconds
+                + rng.uniform(
+                    -config.latency_jitter_seconds, config.latency_jitter_seconds
+                ),
+            )
+        )
+        if method == "getMe":
+            return _json_response(
+                {
+                    "ok": True,
+                    "result": {
+                        "id": int(token.split(":")[0]),
+                        "is_bot": True,
+                        "first_name": "Benchmark",
+                        "username": "benchmark_bot",
+                    },
+                }
+            )
+        if method != "sendMessage":
+            return _json_response({"ok": True, "result": True})
+
+        if rng.random() < config.error_429_rate:
+            return _too_many_requests(config.retry_after_seconds)
+        chat_id = str(parameters.get("chat_id"))
+        now = time.monotonic()
+        wait_seconds = (
+            last_sent_at.get(chat_id, -math.inf)
+            + config.per_chat_interval_seconds
+            - now
+        )
+        if wait_seconds > 0:
+            return _too_many_requests(math.ceil(wait_seconds))
+        last_sent_at[chat_id] = now
+        return _json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": next(message_ids),
+                    "date": int(time.time()),
+                    "chat": {"id": int(chat_id), "type": "private"},
+                    "text": parameters.get("text", ""),
+                },
+            }
+        )
+
+    return app
+
+
+def _shift(value: str, shift: datetime.timedelta) -> str:
+    return (datetime.datetime.fromisoformat(value) + shift).isoformat()
+
+
+def load_current_forecast_payload() -> bytes:
+    """
+    The 24 hour forecast fixture, moved in time so its first record was published just now and its periods
+    have not ended yet. The bot skips periods in the past, so the replayed fixture would never be broadcast.
+    """
+    payload = json.loads((FIXTURES_DIR / "twenty_four_hour_forecast.json").read_bytes())
+    records = payload["data"]["records"]
+    published_at = datetime.datetime.fromisoformat(records[0]["updatedTimestamp"])
+    shift = datetime.datetime.now(published_at.tzinfo) - published_at
+    for record in records:
+        record["updatedTimestamp"] = _shift(record["updatedTimestamp"], shift)
+        record["date"] = (
+            datetime.datetime.fromisoformat(record["updatedTimestamp"])
+            .date()
+            .isoformat()
+        )
+        periods = [
+            record["general"]["validPeriod"],
+            *(period["timePeriod"] for period in record["periods"]),
+        ]
+        for period in periods:
+            period["start"] = _shift(period["start"], shift)
+            period["end"] = _shift(period["end"], shift)
+    return json.dumps(payload).encode()
+
+
+def create_fake_open_gov_app(config: FakeOpenGovConfig) -> FastAPI:
+    """
+    Replays the 24 hour forecast fixture, published when the app was created.
+    """
+    app = FastAPI()
+    body = load_current_forecast_payload()
+
+    @app.get("/v2/real-time/api/twenty-four-hr-forecast")
+    async def twenty_four_hour_forecast():
+        await asyncio.sleep(config.latency_seconds)
+        return Response(content=body, media_type="application/json")
+
+    return app
+
+
+def _serve(
+    create_app: Callable[[BaseModel], FastAPI],
+    config: BaseModel,
+    host: str,
+    port: int,
+):
+    uvicorn.run(create_app(config), host=host, port=port, log_level="warning")
+
+
+def _wait_for_port(host: str, port: int, timeout_seconds: float):
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Stand-in on {host}:{port} did not start")
+            time.sleep(0.1)
+
+
+def serve_in_background(
+    create_app: Callable[[BaseModel], FastAPI],
+    config: BaseModel,
+    port: int,
+    host: str = "127.0.0.1",
+    timeout_seconds: float = 10,
+) -> BaseProcess:
+    """
+    Serves the app of `create_app(config)` from a separate process and waits until it accepts connections.
+    The caller is responsible for terminating the process.
+    """
+    process = multiprocessing.get_context("spawn").Process(
+        target=_serve,
+        args=(create_app, config, host, port),
+        daemon=True,
+    )
+    process.start()
+    try:
+        _wait_for_port(host, port, timeout_seconds)
+    except TimeoutError:
+        process.terminate()
+        raise
+    return process
@@ -0,0 +1,306 @@
+"""
+Load generator for inbound updates: simulated users walk through /start, /configure, setting an alert start time
+and /unsubscribe, with every message put on the update queue of an application built by
+`WeatherConversationDirector.construct`, as the webhook and polling do in production.
+
+Each user waits for the bot's reply before sending the next message, like a person would. Bot API calls are
+answered in process after `--bot-api-latency-ms`, so the numbers reflect the handlers rather than a network.
+Reported are updates per second, reply latency per step, handler latency from the
+`telegram_handler_duration_seconds` metric and database round trips per update.
+
+Without `--concurrent-updates` the application processes one update at a time, the baseline. With it a
+`ChatOrderedUpdateProcessor` processes that many updates at once.
+
+Tables of the `--database` database are dropped and recreated, it must not hold anything worth keeping.
+
+Usage (from the backend directory, with the POSTGRES_* settings pointing at a server that has the database):
+    python -m benchmarks.updates --users 1000 --concurrency 100
+    python -m benchmarks.updates --users 1000 --concurrency 100 --rounds 3 --cache-backend redis
+    python -m benchmarks.updates --users 1000 --concurrency 100 --concurrent-updates 16
+"""
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import os
+import time
+from typing import List, Tuple
+from telegram.request import BaseRequest, RequestData
+from benchmarks.broadcast import BOT_TOKEN, StatementTimer, percentile_ms
+
+# (step, text sent by the user), in the order of a conversation
+FLOW = [
+    ("start", "/start"),
+    ("configure", "/configure"),
+    ("select_option", "Start time of alerts"),
+    ("alert_time", "07:30"),
+    ("unsubscribe", "/unsubscribe"),
+]
+
+
+class InProcessBotApi(BaseRequest):
+    """
+    Answers Bot API calls in process after `latency_seconds`. Messages sent by the bot are handed to the queue
+    of their chat, so simulated users can wait for a reply.
+    """
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+        self.replies: collections.defaultdict[int, asyncio.Queue[str]] = (
+            collections.defaultdict(asyncio.Queue)
+        )
+        self.__message_ids = itertools.count(1)
+
+    @property
+    def read_timeout(self) -> float | None:
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData | None = None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None,
+    ) -> Tuple[int, bytes]:
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+        api_method = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters if request_data else {}
+        result: dict | bool = True
+        if api_method == "getMe":
+            result = {
+                "id": int(BOT_TOKEN.split(":")[0]),
+                "is_bot": True,
+                "first_name": "Benchmark",
+                "username": "benchmark_bot",
+            }
+        elif api_method == "sendMessage":
+            chat_id = int(parameters["chat_id"])
+            result = {
+                "message_id": next(self.__message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": parameters.get("text", ""),
+            }
+            self.replies[chat_id].put_nowait(str(parameters.get("text", "")))
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+def build_update(update_id: int, user_id: int, text: str) -> dict:
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": user_id, "type": "private"},
+        "from": {
+            "id": user_id,
+            "is_bot": False,
+            "first_name": "First",
+            "last_name": "Last",
+            "username": f"user{user_id}",
+        },
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [
+            {"type": "bot_command", "offset": 0, "length": len(text)}
+        ]
+    return {"update_id": update_id, "message": message}
+
+
+async def _reset_database():
+    from src.core.sql import SQLBase, async_engine
+    from src.models import broadcast, forecast, preferences, telegram  # noqa: F401
+
+    async with async_engine.begin() as connection:
+        await connection.run_sync(SQLBase.metadata.drop_all)
+        await connection.run_sync(SQLBase.metadata.create_all)
+
+
+def _handler_latencies(samples) -> dict[str, Tuple[int, float, float, float]]:
+    """
+    Count, mean, p50 and p99 per handler from the samples of a histogram. Percentiles are the upper bound of
+    the bucket they fall in.
+    """
+    buckets: dict[str, List[Tuple[float, float]]] = collections.defaultdict(list)
+    sums: dict[str, float] = {}
+    for name, labels, value in samples:
+        handler = labels["handler"]
+        if name.endswith("_bucket"):
+            buckets[handler].append((float(labels["le"]), value))
+        elif name.endswith("_sum"):
+            sums[handler] = value
+
+    def upper_bound(handler_buckets: List[Tuple[float, float]], quantile: float):
+        count = handler_buckets[-1][1]
+        return next(
+            bound
+            for bound, cumulative in handler_buckets
+            if cumulative >= quantile * count
+        )
+
+    latencies = {}
+    for handler, handler_buckets in buckets.items():
+        count = int(handler_buckets[-1][1])
+        if not count:
+            continue
+        latencies[handler] = (
+            count,
+            sums[handler] / count,
+            upper_bound(handler_buckets, 0.5),
+            upper_bound(handler_buckets, 0.99),
+        )
+    return latencies
+
+
+async def run(args: argparse.Namespace):
+    # settings are read from the environment on import, which `main` prepared
+    from sqlalchemy import event
+    from telegram import Update
+    from telegram.ext import Application
+    from src.core.fetch import close_async_client
+    from src.core.sql import async_engine
+    from src.microservices.weather_bot.services.weather import (
+        WeatherConversationDirector,
+        WeatherService,
+    )
+    from src.microservices.weather_bot.utils.metrics import (
+        telegram_handler_duration_seconds,
+    )
+    from src.microservices.weather_bot.utils.update_processor import (
+        ChatOrderedUpdateProcessor,
+    )
+
+    await _reset_database()
+    timer = StatementTimer()
+    event.listen(
+        async_engine.sync_engine, "before_cursor_execute", timer.before_cursor_execute
+    )
+    event.listen(
+        async_engine.sync_engine, "after_cursor_execute", timer.after_cursor_execute
+    )
+
+    bot_api = InProcessBotApi(args.bot_api_latency_ms / 1000)
+    builder = Application.builder().token(BOT_TOKEN).request(bot_api).updater(None)
+    builder = builder.concurrent_updates(
+        ChatOrderedUpdateProcessor(max_running_updates=args.concurrent_updates)
+        if args.concurrent_updates > 1
+        else False
+    )
+    application = builder.build()
+    service = WeatherService()
+    WeatherConversationDirector(application=application, service=service).construct()
+
+    update_ids = itertools.count(1)
+    step_latencies: dict[str, List[float]] = collections.defaultdict(list)
+    timeouts = 0
+    concurrency = asyncio.Semaphore(args.concurrency)
+
+    async def simulate_user(user_id: int):
+        nonlocal timeouts
+        replies = bot_api.replies[user_id]
+        async with concurrency:
+            for _ in range(args.rounds):
+                for step, text in FLOW:
+                    update = Update.de_json(
+                        build_update(next(update_ids), user_id, text), application.bot
+                    )
+                    start = time.perf_counter()
+                    await application.update_queue.put(update)
+                    try:
+                        await asyncio.wait_for(replies.get(), args.reply_timeout)
+                    except asyncio.TimeoutError:
+                        timeouts += 1
+                        return
+                    step_latencies[step].append(time.perf_counter() - start)
+
+    async with application:
+        await application.start()
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(simulate_user(user_id) for user_id in range(1, args.users + 1))
+        )
+        duration_seconds = time.perf_counter() - start
+        # waits for the non-blocking handlers still running
+        await application.stop()
+        await service.user_tracker.flush()
+    await close_async_client()
+    await async_engine.dispose()
+
+    updates = next(update_ids) - 1
+    print(
+        f"{updates} updates from {args.users} users in {duration_seconds:.2f}s - "
+        f"{updates / duration_seconds:.1f} updates/s, {timeouts} users timed out"
+    )
+    print(
+        f"{timer.statements / updates:.2f} database round trips and "
+        f"{bot_api.calls / updates:.2f} Bot API calls per update, "
+        f"{timer.execute_seconds:.2f}s executing statements"
+    )
+    print(f"\n{'step':>16} {'replies':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for step, _ in FLOW:
+        latencies = step_latencies[step]
+        print(
+            f"{step:>16} {len(latencies):>8} {percentile_ms(latencies, 50):>9.1f} "
+            f"{percentile_ms(latencies, 99):>9.1f}"
+        )
+    print(
+        f"\n{'handler':>30} {'calls':>8} {'mean (ms)':>10} {'p50 <= (ms)':>12} {'p99 <= (ms)':>12}"
+    )
+    for handler, (count, mean, p50, p99) in sorted(
+        _handler_latencies(telegram_handler_duration_seconds.samples()).items()
+    ):
+        print(
+            f"{handler:>30} {count:>8} {mean * 1000:>10.1f} "
+            f"{p50 * 1000:>12.0f} {p99 * 1000:>12.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=1,
+        help="times every user goes through the flow, later rounds are served by warm caches",
+    )
+    parser.add_argument("--database", default="alerts_benchmark")
+    parser.add_argument(
+        "--cache-backend", choices=["memory", "redis"], default="memory"
+    )
+    parser.add_argument("--bot-api-latency-ms", type=float, default=0)
+    parser.add_argument("--reply-timeout", type=float, default=30)
+    parser.add_argument(
+        "--concurrent-updates",
+        type=int,
+        default=0,
+        help="process this many updates at once, one at a time by default",
+    )
+    args = parser.parse_args()
+
+    os.environ.update(
+        {
+            "POSTGRES_DB": args.database,
+            "TELEGRAM_BOT_TOKEN": BOT_TOKEN,
+            "CACHE_BACKEND": args.cache_backend,
+            "BROADCAST_SHARD_COUNT": "1",
+        }
+    )
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
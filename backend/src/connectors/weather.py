@@ -1,22 +1,442 @@
+import asyncio
 import datetime
+import re
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Iterable, Type, TypeVar
+import httpx
+from pydantic import BaseModel, ValidationError
+from src.core.circuit_breaker import CircuitBreaker
+from src.core.config import settings
+from src.core.depends import Depends
+from src.core.enums import CircuitStateEnum, FetchErrorEnum
+from src.core.metrics import metrics
 from src.core.routes import open_gov_v2_endpoint
-from src.core.fetch import fetch
-from src.schemas.weather import TwentyFourHourParams, TwentyFourHourSchema
+from src.core.fetch import FetchResult, async_fetch
+from src.schemas.weather import (
+    FourDayOutlookParams,
+    FourDayOutlookSchema,
+    FourDayRecordSchema,
+    RecordSchema,
+    TwentyFourHourParams,
+    TwentyFourHourSchema,
+)
+
+# Cheap lookup of the first record's updatedTimestamp without decoding the whole payload
+UPDATED_TIMESTAMP_REGEX = re.compile(rb'"updatedTimestamp"\s*:\s*"([^"]+)"')
+LATEST_CACHE_KEY = "latest"
+# marks a date whose pages are exhausted in `__iter_records_for_dates`
+_DATE_DONE = object()
+
+PageT = TypeVar("PageT", TwentyFourHourSchema, FourDayOutlookSchema)
+
+
+class ForecastCacheEntry(BaseModel):
+    forecast: TwentyFourHourSchema
+    body: bytes
+    updated_timestamp: bytes | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    # time.monotonic() of the last successful round trip with upstream
+    fetched_at: float
+
+
+class ForecastSnapshotSchema(BaseModel):
+    forecast: TwentyFourHourSchema
+    # seconds since the forecast was last confirmed with upstream
+    age_seconds: float
+    # older than the cache TTL, served because upstream could not be reached or to answer without waiting
+    is_stale: bool
+
+
+# shared by every connector, the upstream is either healthy or not
+weather_api_breaker = CircuitBreaker(
+    "data.gov.sg",
+    failure_threshold=settings.WEATHER_CIRCUIT_FAILURE_THRESHOLD,
+    base_backoff_seconds=settings.WEATHER_CIRCUIT_BASE_BACKOFF_SECONDS,
+    max_backoff_seconds=settings.WEATHER_CIRCUIT_MAX_BACKOFF_SECONDS,
+)
+
+circuit_state_values = {
+    CircuitStateEnum.CLOSED: 0,
+    CircuitStateEnum.HALF_OPEN: 1,
+    CircuitStateEnum.OPEN: 2,
+}
+weather_api_request_duration_seconds = metrics.histogram(
+    "weather_api_request_duration_seconds",
+    "Duration of data.gov.sg requests, by endpoint and HTTP status or fetch error.",
+    ("endpoint", "status"),
+)
+metrics.gauge(
+    "weather_api_circuit_state",
+    "State of the data.gov.sg circuit breaker: 0 closed, 1 half open, 2 open.",
+    callback=lambda: circuit_state_values[weather_api_breaker.state],
+)
 
 
 class WeatherConnector:
-    def get_24_hour_forecast_sg(
+    def __init__(
         self,
-        datetime: datetime.datetime,
-    ) -> TwentyFourHourSchema | None:
-        # formatted datetime string to be parsed YYYY-MM-DDTHH:mm:ss
-        format_datetime_param = datetime.strftime("%Y-%m-%dT%H:%M:%S")
+        ttl_seconds: float = settings.WEATHER_FORECAST_CACHE_TTL_SECONDS,
+        max_entries: int = settings.WEATHER_FORECAST_CACHE_MAX_ENTRIES,
+        max_concurrent_requests: int = settings.WEATHER_MAX_CONCURRENT_REQUESTS,
+        stale_max_age_seconds: float = settings.WEATHER_FORECAST_STALE_MAX_AGE_SECONDS,
+        breaker: CircuitBreaker = Depends(weather_api_breaker),
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stale_max_age_seconds = stale_max_age_seconds
+        self.breaker = breaker
+        self.max_entries = max_entries
+        self.max_concurrent_requests = max_concurrent_requests
+        # shared by every paginated read, bounds the requests in flight to data.gov.sg
+        self.__request_semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self.__cache: OrderedDict[str, ForecastCacheEntry] = OrderedDict()
+        self.__locks: dict[str, asyncio.Lock] = {}
+        self.__refresh_tasks: dict[str, asyncio.Task] = {}
+
+    def __get_lock(self, key: str) -> asyncio.Lock:
+        lock = self.__locks.get(key)
+        if not lock:
+            lock = self.__locks[key] = asyncio.Lock()
+        return lock
+
+    def __get_fresh_entry(self, key: str) -> ForecastCacheEntry | None:
+        entry = self.__cache.get(key)
+        if entry and time.monotonic() - entry.fetched_at < self.ttl_seconds:
+            self.__cache.move_to_end(key)
+            return entry
+        return None
+
+    def __set_entry(self, key: str, entry: ForecastCacheEntry):
+        self.__cache[key] = entry
+        self.__cache.move_to_end(key)
+        while len(self.__cache) > self.max_entries:
+            evicted, _ = self.__cache.popitem(last=False)
+            self.__locks.pop(evicted, None)
+
+    def __conditional_headers(self, entry: ForecastCacheEntry | None) -> dict:
+        headers = {}
+        if not entry:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
 
-        response = fetch(
-            url=open_gov_v2_endpoint.twenty_four_hour_weather_forecast,
-            params=TwentyFourHourParams(date=format_datetime_param),
+    def __get_usable_entry(self, key: str) -> ForecastCacheEntry | None:
+        entry = self.__cache.get(key)
+        if entry and time.monotonic() - entry.fetched_at < self.stale_max_age_seconds:
+            self.__cache.move_to_end(key)
+            return entry
+        return None
+
+    def __snapshot(self, entry: ForecastCacheEntry) -> ForecastSnapshotSchema:
+        age_seconds = time.monotonic() - entry.fetched_at
+        return ForecastSnapshotSchema(
+            forecast=entry.forecast,
+            age_seconds=age_seconds,
+            is_stale=age_seconds >= self.ttl_seconds,
         )
-        if not response:
+
+    def __is_upstream_failure(self, result: FetchResult) -> bool:
+        if result.ok:
+            return False
+        if result.error == FetchErrorEnum.HTTP_STATUS and result.status_code:
+            # any other 4xx is an answer from a healthy upstream
+            return (
+                result.status_code >= 500
+                or result.status_code == httpx.codes.TOO_MANY_REQUESTS
+            )
+        return True
+
+    def __record_result(self, result: FetchResult, started_at: float):
+        if self.__is_upstream_failure(result):
+            self.breaker.record_failure(started_at)
+        else:
+            self.breaker.record_success(started_at)
+
+    def __validate(self, result: FetchResult, schema: Type[BaseModel]) -> FetchResult:
+        if not result.ok or not result.response:
+            return result
+        try:
+            # validate the raw bytes in one pass instead of building dicts first
+            payload = schema.model_validate_json(result.response.content)
+        except ValidationError as e:
+            print(f"Weather Connector - invalid {schema.__name__} payload - {e}")
+            return FetchResult(error=FetchErrorEnum.INVALID_PAYLOAD, message=str(e))
+        return result.model_copy(update={"payload": payload})
+
+    async def __fetch(
+        self, url: str, schema: Type[BaseModel] | None = None, **kwargs
+    ) -> FetchResult | None:
+        """
+        :param schema: validate the response body against `schema` into `payload`, a body that does not match
+        counts as a failure of upstream
+        :return: None if the circuit is open and the request was not sent
+        """
+        if not self.breaker.allow_request():
+            return None
+        started_at = time.monotonic()
+        start = time.perf_counter()
+        try:
+            result = await async_fetch(url=url, **kwargs)
+            if schema:
+                result = self.__validate(result, schema)
+            weather_api_request_duration_seconds.observe(
+                time.perf_counter() - start,
+                endpoint=url.rstrip("/").rsplit("/", 1)[-1],
+                status=str(result.status_code or result.error.value),
+            )
+            self.__record_result(result, started_at)
+            return result
+        finally:
+            # a cancelled request is never recorded, it must not hold on to the probe
+            self.breaker.release_probe(started_at)
+
+    async def __refresh(
+        self, key: str, format_datetime_param: str | None
+    ) -> ForecastCacheEntry | None:
+        """
+        Revalidates the cached forecast of `key` with upstream, concurrent callers share a single request.
+
+        :return: the refreshed entry, None if upstream failed or the circuit is open
+        """
+        async with self.__get_lock(key):
+            # another caller may have refreshed the entry while we waited on the lock
+            entry = self.__get_fresh_entry(key)
+            if entry:
+                return entry
+            stale_entry = self.__cache.get(key)
+
+            result = await self.__fetch(
+                open_gov_v2_endpoint.twenty_four_hour_weather_forecast,
+                params=TwentyFourHourParams(date=format_datetime_param).model_dump(
+                    exclude_none=True
+                ),
+                headers=self.__conditional_headers(stale_entry),
+            )
+            if not result or not result.ok or not result.response:
+                return None
+
+            response = result.response
+            now = time.monotonic()
+            if stale_entry and response.status_code == 304:
+                entry = stale_entry.model_copy(update={"fetched_at": now})
+                self.__set_entry(key, entry)
+                return entry
+
+            body = response.content
+            match = UPDATED_TIMESTAMP_REGEX.search(body)
+            updated_timestamp = match.group(1) if match else None
+            if stale_entry and (
+                body == stale_entry.body
+                or (
+                    updated_timestamp is not None
+                    and updated_timestamp == stale_entry.updated_timestamp
+                )
+            ):
+                forecast = stale_entry.forecast
+            else:
+                try:
+                    # validate the raw bytes in one pass instead of building dicts first
+                    forecast = TwentyFourHourSchema.model_validate_json(body)
+                except ValidationError as e:
+                    print(f"Weather Connector - invalid forecast payload - {e}")
+                    return None
+
+            entry = ForecastCacheEntry(
+                forecast=forecast,
+                body=body,
+                updated_timestamp=updated_timestamp,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                fetched_at=now,
+            )
+            self.__set_entry(key, entry)
+            return entry
+
+    def __refresh_in_background(self, key: str, format_datetime_param: str | None):
+        task = self.__refresh_tasks.get(key)
+        if task and not task.done():
+            return
+        task = asyncio.create_task(self.__refresh(key, format_datetime_param))
+        self.__refresh_tasks[key] = task
+        task.add_done_callback(lambda _: self.__refresh_tasks.pop(key, None))
+
+    async def get_24_hour_forecast_snapshot(
+        self,
+        datetime: datetime.datetime | None = None,
+        allow_stale: bool = False,
+    ) -> ForecastSnapshotSchema | None:
+        """
+        Returns the 24 hour forecast at `datetime`, or the latest forecast if omitted, along with its age.
+
+        Responses are cached per requested date for `ttl_seconds`. Concurrent callers share a single upstream
+        request, and once the TTL lapses the cached payload is revalidated with a conditional GET so an unchanged
+        forecast is neither downloaded nor parsed again.
+
+        While upstream is failing, or its circuit is open, the last good forecast is served for up to
+        `stale_max_age_seconds`.
+
+        :param allow_stale: answer right away with an expired forecast and revalidate it in the background
+        """
+        # formatted datetime string to be parsed YYYY-MM-DDTHH:mm:ss
+        format_datetime_param = datetime and datetime.strftime("%Y-%m-%dT%H:%M:%S")
+        key = format_datetime_param or LATEST_CACHE_KEY
+
+        entry = self.__get_fresh_entry(key)
+        if entry:
+            return self.__snapshot(entry)
+
+        usable_entry = self.__get_usable_entry(key)
+        if allow_stale and usable_entry:
+            self.__refresh_in_background(key, format_datetime_param)
+            return self.__snapshot(usable_entry)
+
+        entry = await self.__refresh(key, format_datetime_param)
+        if entry:
+            return self.__snapshot(entry)
+        # upstream failed, fall back to the last good forecast
+        usable_entry = self.__get_usable_entry(key)
+        return usable_entry and self.__snapshot(usable_entry)
+
+    async def get_24_hour_forecast_sg(
+        self,
+        datetime: datetime.datetime | None = None,
+        allow_stale: bool = False,
+    ) -> TwentyFourHourSchema | None:
+        snapshot = await self.get_24_hour_forecast_snapshot(datetime, allow_stale)
+        return snapshot and snapshot.forecast
+
+    async def __get_page(
+        self,
+        url: str,
+        schema: Type[PageT],
+        params: BaseModel,
+    ) -> PageT | None:
+        # the circuit is checked once a request slot is free, so a probe is only taken when it is sent
+        async with self.__request_semaphore:
+            result = await self.__fetch(
+                url, schema, params=params.model_dump(exclude_none=True)
+            )
+        if not result or not result.ok:
             return None
+        return result.payload
+
+    async def __iter_records(
+        self,
+        url: str,
+        schema: Type[PageT],
+        params_schema: Type[BaseModel],
+        date: datetime.date | None,
+    ) -> AsyncIterator:
+        """
+        Yields the records of every page published on `date`, following `paginationToken`.
+
+        The next page is requested as soon as the current one arrives, so it downloads while the caller is still
+        processing the current page's records.
+        """
+        format_date_param = date and date.strftime("%Y-%m-%d")
+        next_page = asyncio.create_task(
+            self.__get_page(url, schema, params_schema(date=format_date_param))
+        )
+        try:
+            while next_page:
+                page = await next_page
+                next_page = None
+                if not page:
+                    return
+                if page.data.paginationToken:
+                    next_page = asyncio.create_task(
+                        self.__get_page(
+                            url,
+                            schema,
+                            params_schema(
+                                date=format_date_param,
+                                paginationToken=page.data.paginationToken,
+                            ),
+                        )
+                    )
+                for record in page.data.records:
+                    yield record
+        finally:
+            # the caller stopped iterating early, drop the prefetched page
+            if next_page:
+                next_page.cancel()
+
+    async def __iter_records_for_dates(
+        self,
+        records_of: Callable[[datetime.date], AsyncIterator],
+        dates: Iterable[datetime.date],
+    ) -> AsyncIterator:
+        """
+        Yields the records of every date in `dates`, in the order they arrive.
+
+        Dates are read concurrently, with at most `max_concurrent_requests` requests in flight. Records are
+        buffered in a bounded queue so a slow consumer holds back the producers instead of growing memory.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrent_requests * 4)
 
-        return TwentyFourHourSchema(**response.json())
+        async def produce(date: datetime.date):
+            try:
+                async for record in records_of(date):
+                    await queue.put(record)
+            except Exception as e:
+                print(f"Weather Connector - failed to read {date}: {e}")
+            await queue.put(_DATE_DONE)
+
+        producers = [asyncio.create_task(produce(date)) for date in dates]
+        pending = len(producers)
+        try:
+            while pending:
+                record = await queue.get()
+                if record is _DATE_DONE:
+                    pending -= 1
+                    continue
+                yield record
+        finally:
+            for producer in producers:
+                producer.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+
+    def iter_24_hour_forecasts(
+        self,
+        date: datetime.date,
+    ) -> AsyncIterator[RecordSchema]:
+        """
+        Yields every 24 hour forecast record published on `date`. Unlike `get_24_hour_forecast_sg` this is not
+        cached, it is meant for bulk reads such as backfilling the archive.
+        """
+        return self.__iter_records(
+            open_gov_v2_endpoint.twenty_four_hour_weather_forecast,
+            TwentyFourHourSchema,
+            TwentyFourHourParams,
+            date,
+        )
+
+    def iter_24_hour_forecasts_for_dates(
+        self,
+        dates: Iterable[datetime.date],
+    ) -> AsyncIterator[RecordSchema]:
+        return self.__iter_records_for_dates(self.iter_24_hour_forecasts, dates)
+
+    def iter_four_day_outlook(
+        self,
+        date: datetime.date | None = None,
+    ) -> AsyncIterator[FourDayRecordSchema]:
+        """
+        Yields the four day outlook records published on `date`, or the latest outlook if omitted.
+        """
+        return self.__iter_records(
+            open_gov_v2_endpoint.four_day_weather_forecast,
+            FourDayOutlookSchema,
+            FourDayOutlookParams,
+            date,
+        )
+
+    def iter_four_day_outlooks(
+        self,
+        dates: Iterable[datetime.date],
+    ) -> AsyncIterator[FourDayRecordSchema]:
+        return self.__iter_records_for_dates(self.iter_four_day_outlook, dates)
@@ -0,0 +1,143 @@
+import asyncio
+import io
+import pathlib
+from abc import ABC, abstractmethod
+from typing import List
+from minio import Minio
+from minio.error import S3Error
+from .config import settings
+from .enums import ArchiveBackendEnum
+
+
+class ArchiveStore(ABC):
+    """
+    Blob storage for archived batch files, addressed by `/` separated keys.
+    """
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes):
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        pass
+
+    @abstractmethod
+    async def list_keys(self, prefix: str = "") -> List[str]:
+        pass
+
+
+class LocalArchiveStore(ArchiveStore):
+    """
+    Archive kept in a local directory, for tests and running without MinIO.
+    """
+
+    def __init__(self, directory: str = settings.FORECAST_ARCHIVE_LOCAL_DIR):
+        self.directory = pathlib.Path(directory)
+
+    def __write(self, key: str, data: bytes):
+        path = self.directory / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # readers never see a partially written file
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_bytes(data)
+        temp_path.replace(path)
+
+    def __read(self, key: str) -> bytes | None:
+        path = self.directory / key
+        if not path.is_file():
+            return None
+        return path.read_bytes()
+
+    def __list_keys(self, prefix: str) -> List[str]:
+        if not self.directory.is_dir():
+            return []
+        keys = (
+            path.relative_to(self.directory).as_posix()
+            for path in self.directory.rglob("*")
+            if path.is_file() and not path.name.startswith(".")
+        )
+        return sorted(key for key in keys if key.startswith(prefix))
+
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(self.__write, key, data)
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self.__read, key)
+
+    async def list_keys(self, prefix: str = "") -> List[str]:
+        return await asyncio.to_thread(self.__list_keys, prefix)
+
+
+class MinioArchiveStore(ArchiveStore):
+    def __init__(
+        self,
+        endpoint: str = settings.MINIO_ENDPOINT,
+        access_key: str = settings.MINIO_ACCESS_KEY,
+        secret_key: str = settings.MINIO_SECRET_KEY,
+        bucket: str = settings.MINIO_ARCHIVE_BUCKET,
+        secure: bool = settings.MINIO_SECURE,
+    ):
+        self.bucket = bucket
+        # the client is synchronous, every call is run in a worker thread
+        self.client = Minio(
+            endpoint,
+            access_key=access_key,
+            secret_key=secret_key,
+            secure=secure,
+        )
+        self.__bucket_ready = False
+
+    def __ensure_bucket(self):
+        if self.__bucket_ready:
+            return
+        if not self.client.bucket_exists(self.bucket):
+            self.client.make_bucket(self.bucket)
+        self.__bucket_ready = True
+
+    def __write(self, key: str, data: bytes):
+        self.__ensure_bucket()
+        self.client.put_object(self.bucket, key, io.BytesIO(data), len(data))
+
+    def __read(self, key: str) -> bytes | None:
+        try:
+            response = self.client.get_object(self.bucket, key)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchBucket"):
+                return None
+            raise
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def __list_keys(self, prefix: str) -> List[str]:
+        if not self.client.bucket_exists(self.bucket):
+            return []
+        return sorted(
+            item.object_name
+            for item in self.client.list_objects(
+                self.bucket, prefix=prefix, recursive=True
+            )
+        )
+
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(self.__write, key, data)
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self.__read, key)
+
+    async def list_keys(self, prefix: str = "") -> List[str]:
+        return await asyncio.to_thread(self.__list_keys, prefix)
+
+
+def create_archive_store(
+    backend: ArchiveBackendEnum = ArchiveBackendEnum(settings.FORECAST_ARCHIVE_BACKEND),
+) -> ArchiveStore:
+    if backend == ArchiveBackendEnum.MINIO:
+        return MinioArchiveStore()
+    return LocalArchiveStore()
+
+
+archive_store = create_archive_store()
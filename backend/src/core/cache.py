@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+from abc import ABC, abstractmethod
+from redis.asyncio import Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.exceptions import RedisError
+from .config import settings
+from .enums import CacheBackendEnum
+
+
+class CacheBackend(ABC):
+    """
+    Minimal key-value cache interface used by the repositories.
+
+    Backends must never raise on cache failures, a failed read is a miss and a failed write is ignored.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl_ms: int | None = None):
+        pass
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        pass
+
+    async def close(self):
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Process local stand-in for Redis, for tests and running without a Redis instance.
+
+    Holds at most `max_entries` keys, the least recently used key is evicted when a new one does not fit.
+    """
+
+    def __init__(
+        self,
+        ttl_ms: int = settings.REDIS_CACHE_TTL_MS,
+        max_entries: int = settings.MEMORY_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_ms = ttl_ms
+        self.max_entries = max_entries
+        self.__store: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        item = self.__store.get(key)
+        if not item:
+            return None
+        value, expires_at = item
+        if time.monotonic() >= expires_at:
+            del self.__store[key]
+            return None
+        self.__store.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl_ms: int | None = None):
+        expires_at = time.monotonic() + (ttl_ms or self.ttl_ms) / 1000
+        self.__store[key] = (value, expires_at)
+        self.__store.move_to_end(key)
+        while len(self.__store) > self.max_entries:
+            self.__store.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.__store.pop(key, None)
+
+
+class RedisCacheBackend(CacheBackend):
+    def __init__(
+        self,
+        host: str = settings.REDIS_CACHE_HOST,
+        port: int = settings.REDIS_CACHE_PORT,
+        db: int = settings.REDIS_CACHE_DB,
+        password: str | None = settings.REDIS_PASSWORD,
+        ttl_ms: int = settings.REDIS_CACHE_TTL_MS,
+        socket_timeout: float = settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout: float = settings.REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS,
+    ):
+        self.ttl_ms = ttl_ms
+        # connects lazily on first command
+        self.client = Redis(
+            host=host,
+            port=port,
+            db=db,
+            password=password or None,
+            decode_responses=True,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            # a cache miss is cheaper than retrying a Redis that does not answer
+            retry=Retry(NoBackoff(), retries=0),
+        )
+
+    async def get(self, key: str) -> str | None:
+        try:
+            return await self.client.get(key)
+        except RedisError as e:
+            print(f"Redis Cache Exception - {e}")
+            return None
+
+    async def set(self, key: str, value: str, ttl_ms: int | None = None):
+        try:
+            await self.client.set(key, value, px=ttl_ms or self.ttl_ms)
+        except RedisError as e:
+            print(f"Redis Cache Exception - {e}")
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            await self.client.delete(*keys)
+        except RedisError as e:
+            print(f"Redis Cache Exception - {e}")
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def create_cache_backend(
+    backend: CacheBackendEnum = CacheBackendEnum(settings.CACHE_BACKEND),
+) -> CacheBackend:
+    if backend == CacheBackendEnum.REDIS:
+        return RedisCacheBackend()
+    return InMemoryCacheBackend()
+
+
+cache_backend = create_cache_backend()
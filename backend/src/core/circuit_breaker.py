@@ -0,0 +1,130 @@
+import time
+from pydantic import BaseModel
+from .enums import CircuitStateEnum
+
+
+class CircuitBreakerStateSchema(BaseModel):
+    name: str
+    state: CircuitStateEnum
+    consecutive_failures: int
+    trips: int
+    # seconds until an open circuit lets a probe request through
+    retry_in_seconds: float
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing.
+
+    CLOSED lets every request through. `failure_threshold` consecutive failures open the circuit, and an OPEN
+    circuit refuses requests for a backoff that doubles on every trip, from `base_backoff_seconds` up to
+    `max_backoff_seconds`. After the backoff the circuit is HALF_OPEN and lets a single probe through. A successful
+    probe closes the circuit and resets the backoff, a failed one opens it again.
+
+    Results of requests that started before the circuit opened arrive late and are ignored, only the probe decides
+    whether an open circuit closes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        base_backoff_seconds: float = 5,
+        max_backoff_seconds: float = 300,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.state = CircuitStateEnum.CLOSED
+        self.consecutive_failures = 0
+        # consecutive times the circuit opened without a success in between
+        self.trips = 0
+        self.__open_until = 0.0
+        self.__probe_in_flight = False
+        self.__probe_started_at = 0.0
+
+    def allow_request(self) -> bool:
+        if self.state == CircuitStateEnum.CLOSED:
+            return True
+        if self.state == CircuitStateEnum.OPEN:
+            if time.monotonic() < self.__open_until:
+                return False
+            self.state = CircuitStateEnum.HALF_OPEN
+            self.__probe_in_flight = False
+        if self.__probe_in_flight:
+            return False
+        self.__probe_in_flight = True
+        self.__probe_started_at = time.monotonic()
+        return True
+
+    def __is_stale(self, started_at: float) -> bool:
+        if self.state == CircuitStateEnum.OPEN:
+            return True
+        return (
+            self.state == CircuitStateEnum.HALF_OPEN
+            and started_at < self.__probe_started_at
+        )
+
+    def record_success(self, started_at: float):
+        """
+        :param started_at: `time.monotonic()` when the request started, after `allow_request` let it through
+        """
+        if self.__is_stale(started_at):
+            return
+        self.state = CircuitStateEnum.CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.__probe_in_flight = False
+
+    def record_failure(self, started_at: float):
+        """
+        :param started_at: `time.monotonic()` when the request started, after `allow_request` let it through
+        """
+        if self.__is_stale(started_at):
+            return
+        self.consecutive_failures += 1
+        if (
+            self.state == CircuitStateEnum.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.__trip()
+
+    def release_probe(self, started_at: float):
+        """
+        Frees the probe slot of a request that ended without a recorded result, e.g. because it was cancelled.
+        Without it the circuit would stay HALF_OPEN and refuse every request for good.
+
+        :param started_at: `time.monotonic()` when the request started, after `allow_request` let it through
+        """
+        if (
+            self.state == CircuitStateEnum.HALF_OPEN
+            and started_at >= self.__probe_started_at
+        ):
+            self.__probe_in_flight = False
+
+    def __trip(self):
+        backoff = min(
+            self.max_backoff_seconds,
+            self.base_backoff_seconds * 2**self.trips,
+        )
+        self.trips += 1
+        self.state = CircuitStateEnum.OPEN
+        self.__open_until = time.monotonic() + backoff
+        self.__probe_in_flight = False
+        print(
+            f"Circuit Breaker - {self.name} opened for {backoff:.1f}s "
+            f"after {self.consecutive_failures} consecutive failures"
+        )
+
+    def snapshot(self) -> CircuitBreakerStateSchema:
+        retry_in_seconds = 0.0
+        if self.state == CircuitStateEnum.OPEN:
+            retry_in_seconds = max(0.0, self.__open_until - time.monotonic())
+        return CircuitBreakerStateSchema(
+            name=self.name,
+            state=self.state,
+            consecutive_failures=self.consecutive_failures,
+            trips=self.trips,
+            retry_in_seconds=retry_in_seconds,
+        )
@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -6,9 +7,49 @@ load_dotenv()
 
 class AppSettings:
     ENV: str | None = os.getenv("BUILD_ENV")
+    # identifies this process when several replicas share the database
+    INSTANCE_ID: str = os.getenv("INSTANCE_ID", f"{socket.gethostname()}-{os.getpid()}")
     OPEN_GOV_ENDPOINT: str = os.getenv(
         "OPEN_GOV_ENDPOINT", "https://api-open.data.gov.sg"
     )
+    # Prometheus `/metrics`, served by the webhook app in webhook mode and on its own port otherwise
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_HOST: str = os.getenv("METRICS_HOST", "0.0.0.0")
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9100"))
+
+
+class WeatherSettings:
+    WEATHER_FORECAST_CACHE_TTL_SECONDS: float = float(
+        os.getenv("WEATHER_FORECAST_CACHE_TTL_SECONDS", "120")
+    )
+    WEATHER_FORECAST_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("WEATHER_FORECAST_CACHE_MAX_ENTRIES", "32")
+    )
+    # upper bound on concurrent requests to data.gov.sg for paginated/multi-date reads
+    WEATHER_MAX_CONCURRENT_REQUESTS: int = int(
+        os.getenv("WEATHER_MAX_CONCURRENT_REQUESTS", "4")
+    )
+    # how long the last good forecast is served while data.gov.sg cannot be reached
+    WEATHER_FORECAST_STALE_MAX_AGE_SECONDS: float = float(
+        os.getenv("WEATHER_FORECAST_STALE_MAX_AGE_SECONDS", "21600")
+    )
+    WEATHER_CIRCUIT_FAILURE_THRESHOLD: int = int(
+        os.getenv("WEATHER_CIRCUIT_FAILURE_THRESHOLD", "3")
+    )
+    WEATHER_CIRCUIT_BASE_BACKOFF_SECONDS: float = float(
+        os.getenv("WEATHER_CIRCUIT_BASE_BACKOFF_SECONDS", "10")
+    )
+    WEATHER_CIRCUIT_MAX_BACKOFF_SECONDS: float = float(
+        os.getenv("WEATHER_CIRCUIT_MAX_BACKOFF_SECONDS", "600")
+    )
+    # comma separated `ForecastChangeTypeEnum` values that trigger a forecast broadcast
+    FORECAST_ALERT_TRANSITIONS: list[str] = [
+        transition.strip()
+        for transition in os.getenv(
+            "FORECAST_ALERT_TRANSITIONS", "rain_onset,severity_escalation"
+        ).split(",")
+        if transition.strip()
+    ]
 
 
 class PostgresSettings:
@@ -36,28 +77,149 @@ class SQLAlchemySettings:
     DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "2"))
     DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "3600"))
     DB_POOL_TIMEOUT_SECONDS: int = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    # rows fetched per round trip when streaming large result sets with a server-side cursor
+    DB_STREAM_BATCH_SIZE: int = int(os.getenv("DB_STREAM_BATCH_SIZE", "1000"))
     DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() in (
         "true",
         "1",
     )
 
 
+class RedisSettings:
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "redis")
+    REDIS_CACHE_HOST: str = os.getenv("REDIS_CACHE_HOST", "localhost")
+    REDIS_CACHE_PORT: int = int(os.getenv("REDIS_CACHE_PORT", "6379"))
+    REDIS_CACHE_TTL_MS: int = int(os.getenv("REDIS_CACHE_TTL_MS", "10000"))
+    REDIS_CACHE_DB: int = int(os.getenv("REDIS_CACHE_DB", "0"))
+    REDIS_PASSWORD: str = os.getenv("REDIS_PASSWORD", "")
+    # a hung Redis fails fast and the repositories fall back to the database
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = float(
+        os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", "0.5")
+    )
+    REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS: float = float(
+        os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS", "0.5")
+    )
+    MEMORY_CACHE_MAX_ENTRIES: int = int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "10000"))
+
+
 class MinioSettings:
     MINIO_ACCESS_KEY: str = os.getenv("MINIO_ACCESS_KEY", "")
     MINIO_SECRET_KEY: str = os.getenv("MINIO_SECRET_KEY", "")
     MINIO_ENDPOINT: str = os.getenv("MINIO_ENDPOINT", "")
+    MINIO_SECURE: bool = os.getenv("MINIO_SECURE", "false").lower() == "true"
+    MINIO_ARCHIVE_BUCKET: str = os.getenv("MINIO_ARCHIVE_BUCKET", "forecast-archive")
+
+
+class ArchiveSettings:
+    # falls back to a local directory when no MinIO endpoint is configured
+    FORECAST_ARCHIVE_BACKEND: str = os.getenv(
+        "FORECAST_ARCHIVE_BACKEND",
+        "minio" if os.getenv("MINIO_ENDPOINT") else "local",
+    )
+    FORECAST_ARCHIVE_LOCAL_DIR: str = os.getenv(
+        "FORECAST_ARCHIVE_LOCAL_DIR", "./archive"
+    )
+    # records per COPY and per compressed batch file
+    FORECAST_ARCHIVE_BATCH_SIZE: int = int(
+        os.getenv("FORECAST_ARCHIVE_BATCH_SIZE", "500")
+    )
+    # a batch file is written once it is full or its oldest record waited this long
+    FORECAST_ARCHIVE_FILE_INTERVAL_SECONDS: float = float(
+        os.getenv("FORECAST_ARCHIVE_FILE_INTERVAL_SECONDS", "86400")
+    )
+
+
+class HttpClientSettings:
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = float(
+        os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5")
+    )
+    HTTP_READ_TIMEOUT_SECONDS: float = float(
+        os.getenv("HTTP_READ_TIMEOUT_SECONDS", "10")
+    )
+    HTTP_POOL_TIMEOUT_SECONDS: float = float(
+        os.getenv("HTTP_POOL_TIMEOUT_SECONDS", "5")
+    )
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")
+    )
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(
+        os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60")
+    )
 
 
 class TelegramBotSettings:
     TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN", "")
     TELEGRAM_ENDPOINT: str = os.getenv("TELEGRAM_ENDPOINT", "https://api.telegram.org")
+    # "polling" or "webhook"
+    TELEGRAM_UPDATE_MODE: str = os.getenv("TELEGRAM_UPDATE_MODE", "polling")
+    # max updates waiting for the handlers before ingestion is throttled
+    TELEGRAM_UPDATE_QUEUE_SIZE: int = int(
+        os.getenv("TELEGRAM_UPDATE_QUEUE_SIZE", "1000")
+    )
+    # updates of different chats processed at once, 1 processes every update one after another
+    TELEGRAM_CONCURRENT_UPDATES: int = int(
+        os.getenv("TELEGRAM_CONCURRENT_UPDATES", "16")
+    )
+    # public base url Telegram delivers updates to, e.g. https://bot.example.com
+    TELEGRAM_WEBHOOK_URL: str = os.getenv("TELEGRAM_WEBHOOK_URL", "")
+    TELEGRAM_WEBHOOK_PATH: str = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+    TELEGRAM_WEBHOOK_SECRET: str = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+    TELEGRAM_WEBHOOK_HOST: str = os.getenv("TELEGRAM_WEBHOOK_HOST", "0.0.0.0")
+    TELEGRAM_WEBHOOK_PORT: int = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8080"))
+    TELEGRAM_WEBHOOK_MAX_CONNECTIONS: int = int(
+        os.getenv("TELEGRAM_WEBHOOK_MAX_CONNECTIONS", "40")
+    )
+    TELEGRAM_WEBHOOK_ENQUEUE_TIMEOUT_SECONDS: float = float(
+        os.getenv("TELEGRAM_WEBHOOK_ENQUEUE_TIMEOUT_SECONDS", "1")
+    )
+    # Telegram allows ~30 messages/s globally and ~1 message/s per chat
+    TELEGRAM_BROADCAST_RATE_PER_SECOND: float = float(
+        os.getenv("TELEGRAM_BROADCAST_RATE_PER_SECOND", "25")
+    )
+    TELEGRAM_BROADCAST_WORKERS: int = int(os.getenv("TELEGRAM_BROADCAST_WORKERS", "16"))
+    TELEGRAM_BROADCAST_PER_CHAT_INTERVAL_SECONDS: float = float(
+        os.getenv("TELEGRAM_BROADCAST_PER_CHAT_INTERVAL_SECONDS", "1")
+    )
+    TELEGRAM_BROADCAST_MAX_RETRIES: int = int(
+        os.getenv("TELEGRAM_BROADCAST_MAX_RETRIES", "3")
+    )
+    # > 1 splits each broadcast across the running replicas by telegram.user_id
+    BROADCAST_SHARD_COUNT: int = int(os.getenv("BROADCAST_SHARD_COUNT", "1"))
+    BROADCAST_INSTANCE_HEARTBEAT_SECONDS: float = float(
+        os.getenv("BROADCAST_INSTANCE_HEARTBEAT_SECONDS", "15")
+    )
+    BROADCAST_INSTANCE_TTL_SECONDS: float = float(
+        os.getenv("BROADCAST_INSTANCE_TTL_SECONDS", "45")
+    )
+    ALERT_SCHEDULE_RELOAD_HOURS: float = float(
+        os.getenv("ALERT_SCHEDULE_RELOAD_HOURS", "24")
+    )
+    USER_TRACKER_CACHE_SIZE: int = int(os.getenv("USER_TRACKER_CACHE_SIZE", "10000"))
+    USER_TRACKER_FLUSH_INTERVAL_SECONDS: float = float(
+        os.getenv("USER_TRACKER_FLUSH_INTERVAL_SECONDS", "30")
+    )
+    # known users are written again after this long, rows purged through another replica are re-created
+    USER_TRACKER_MAX_AGE_SECONDS: float = float(
+        os.getenv("USER_TRACKER_MAX_AGE_SECONDS", "3600")
+    )
+    # unsubscribed users are purged after this many days, in batches with a pause in between
+    USER_PURGE_RETENTION_DAYS: int = int(os.getenv("USER_PURGE_RETENTION_DAYS", "30"))
+    USER_PURGE_BATCH_SIZE: int = int(os.getenv("USER_PURGE_BATCH_SIZE", "500"))
+    USER_PURGE_BATCH_PAUSE_SECONDS: float = float(
+        os.getenv("USER_PURGE_BATCH_PAUSE_SECONDS", "0.5")
+    )
 
 
 class Settings(
     AppSettings,
+    WeatherSettings,
     PostgresSettings,
     SQLAlchemySettings,
+    RedisSettings,
     MinioSettings,
+    ArchiveSettings,
+    HttpClientSettings,
     TelegramBotSettings,
 ):
     pass
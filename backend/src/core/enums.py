@@ -12,3 +12,28 @@ class FetchMethodEnum(Enum):
     POST = "POST"
     PUT = "PUT"
     DELETE = "DELETE"
+
+
+class FetchErrorEnum(Enum):
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"
+    HTTP_STATUS = "http_status"
+    # answered, but the body does not match the expected schema
+    INVALID_PAYLOAD = "invalid_payload"
+    UNKNOWN = "unknown"
+
+
+class CacheBackendEnum(Enum):
+    REDIS = "redis"
+    MEMORY = "memory"
+
+
+class ArchiveBackendEnum(Enum):
+    MINIO = "minio"
+    LOCAL = "local"
+
+
+class CircuitStateEnum(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
@@ -1,5 +1,8 @@
+import httpx
+from pydantic import BaseModel, ConfigDict
 from requests import Response, request
-from .enums import FetchMethodEnum
+from .config import settings
+from .enums import FetchMethodEnum, FetchErrorEnum
 
 
 def fetch(
@@ -25,3 +28,95 @@ def fetch(
     except Exception as e:
         print(f"Fetch Exception - {e}")
         return None
+
+
+class FetchResult(BaseModel):
+    """
+    Result of an `async_fetch` call. Exactly one of `response` or `error` is set.
+    """
+
+    response: httpx.Response | None = None
+    error: FetchErrorEnum | None = None
+    status_code: int | None = None
+    message: str | None = None
+    # response body validated against the schema the caller asked for
+    payload: BaseModel | None = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.response is not None
+
+
+# One long-lived client per process so connections to upstream APIs are kept alive and reused.
+_async_client: httpx.AsyncClient | None = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+                read=settings.HTTP_READ_TIMEOUT_SECONDS,
+                write=settings.HTTP_READ_TIMEOUT_SECONDS,
+                pool=settings.HTTP_POOL_TIMEOUT_SECONDS,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+    return _async_client
+
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+async def async_fetch(
+    url: str,
+    method: FetchMethodEnum = FetchMethodEnum.GET,
+    timeout: httpx.Timeout | float | None = None,
+    **kwargs,
+) -> FetchResult:
+    """
+    Non-blocking counterpart of `fetch`, backed by the shared keep-alive client.
+
+    :param url: URL to fetch
+    :param method: Fetch method
+    :param timeout: Overrides the client's default connect/read timeouts for this request
+    :param kwargs: Additional arguments to pass to httpx, refer to https://www.python-httpx.org/api/#asyncclient for more information
+
+    :return: FetchResult with the response if successful, a typed error otherwise
+    """
+    client = get_async_client()
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    try:
+        response = await client.request(method.value, url, **kwargs)
+        # 304 is a valid answer to a conditional request, let the caller reuse its cached copy
+        if response.status_code != httpx.codes.NOT_MODIFIED:
+            response.raise_for_status()
+        return FetchResult(response=response, status_code=response.status_code)
+    except httpx.TimeoutException as e:
+        print(f"Fetch Exception - timeout - {e!r}")
+        return FetchResult(error=FetchErrorEnum.TIMEOUT, message=str(e))
+    except httpx.HTTPStatusError as e:
+        print(f"Fetch Exception - {e}")
+        return FetchResult(
+            error=FetchErrorEnum.HTTP_STATUS,
+            status_code=e.response.status_code,
+            message=str(e),
+        )
+    except httpx.TransportError as e:
+        print(f"Fetch Exception - connection - {e!r}")
+        return FetchResult(error=FetchErrorEnum.CONNECTION, message=str(e))
+    except Exception as e:
+        print(f"Fetch Exception - {e}")
+        return FetchResult(error=FetchErrorEnum.UNKNOWN, message=str(e))
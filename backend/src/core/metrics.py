@@ -0,0 +1,261 @@
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Sequence
+import uvicorn
+from fastapi import FastAPI, Response
+
+# LINK: https://prometheus.io/docs/instrumenting/exposition_formats/#text-based-format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# seconds, from a cache hit to a slow upstream request
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{name}="{_escape_label_value(value)}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric(ABC):
+    type: str
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} expects labels {self.label_names}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.label_names, key))
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        pass
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing value. With `callback` the value is read from elsewhere when scraped.
+    """
+
+    type = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        callback: Callable[[], float] | None = None,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.callback = callback
+        self.__values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self.__values[key] = self.__values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        if self.callback:
+            return [(self.name, {}, self.callback())]
+        with self._lock:
+            values = list(self.__values.items())
+        return [(self.name, self._labels(key), value) for key, value in values]
+
+
+class Gauge(Metric):
+    """
+    Value that goes up and down. With `callback` the value is read from elsewhere when scraped.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        callback: Callable[[], float] | None = None,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.callback = callback
+        self.__values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self.__values[key] = value
+
+    def samples(self) -> Iterable[Sample]:
+        if self.callback:
+            return [(self.name, {}, self.callback())]
+        with self._lock:
+            values = list(self.__values.items())
+        return [(self.name, self._labels(key), value) for key, value in values]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: observations per bucket (last one is +Inf), sum
+        self.__values: dict[tuple[str, ...], tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self.__values.get(key) or (
+                [0] * (len(self.buckets) + 1),
+                0.0,
+            )
+            counts[index] += 1
+            self.__values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = [
+                (key, list(counts), total)
+                for key, (counts, total) in self.__values.items()
+            ]
+        samples: list[Sample] = []
+        for key, counts, total in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        {**labels, "le": _format_value(upper_bound)},
+                        cumulative,
+                    )
+                )
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    In-process registry of metrics, rendered in the Prometheus text exposition format.
+
+    Metrics are declared once at import time by the module that records them and updated from the event loop.
+    Rendering is thread safe so the registry can be scraped from a server running in another thread.
+    """
+
+    def __init__(self):
+        self.__metrics: dict[str, Metric] = {}
+
+    def __register(self, metric: Metric):
+        if metric.name in self.__metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.__metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        callback: Callable[[], float] | None = None,
+    ) -> Counter:
+        return self.__register(Counter(name, documentation, label_names, callback))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        callback: Callable[[], float] | None = None,
+    ) -> Gauge:
+        return self.__register(Gauge(name, documentation, label_names, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.__register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.__metrics.values()):
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                print(f"Metrics Exception - {metric.name} - {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def metrics_response() -> Response:
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
+def start_metrics_server(host: str, port: int) -> uvicorn.Server:
+    """
+    Serves `/metrics` from a daemon thread with its own event loop, for processes that do not run an ASGI app.
+    """
+    app = FastAPI()
+    app.add_api_route("/metrics", metrics_response, methods=["GET"])
+    server = uvicorn.Server(
+        uvicorn.Config(app, host=host, port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, name="metrics-server", daemon=True).start()
+    return server
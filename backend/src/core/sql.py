@@ -1,4 +1,8 @@
+import time
 from functools import wraps
+from typing import Any, Awaitable, Callable
+from pydantic import BaseModel
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
@@ -7,6 +11,7 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import DeclarativeBase, MappedAsDataclass
 from .config import settings
+from .metrics import metrics
 
 
 class SQLBase(DeclarativeBase, MappedAsDataclass):
@@ -36,17 +41,135 @@ async_session = async_sessionmaker(
 )
 
 
+class PoolStatsSchema(BaseModel):
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts_total: int
+    connects_total: int
+    checkout_wait_seconds_total: float
+    checkout_wait_seconds_max: float
+
+
+class PoolMetrics:
+    """
+    Counters for `async_engine`'s connection pool, combined with the live pool status in `snapshot`.
+    """
+
+    def __init__(self):
+        self.checkouts_total = 0
+        self.connects_total = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+
+    def on_checkout(self, *_):
+        self.checkouts_total += 1
+
+    def on_connect(self, *_):
+        self.connects_total += 1
+
+    def observe_wait(self, seconds: float):
+        db_pool_checkout_wait_seconds.observe(seconds)
+        self.checkout_wait_seconds_total += seconds
+        self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, seconds)
+
+    def snapshot(self) -> PoolStatsSchema:
+        pool = async_engine.sync_engine.pool
+        return PoolStatsSchema(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            checkouts_total=self.checkouts_total,
+            connects_total=self.connects_total,
+            checkout_wait_seconds_total=self.checkout_wait_seconds_total,
+            checkout_wait_seconds_max=self.checkout_wait_seconds_max,
+        )
+
+
+db_pool_checkout_wait_seconds = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+pool_metrics = PoolMetrics()
+event.listen(async_engine.sync_engine, "checkout", pool_metrics.on_checkout)
+event.listen(async_engine.sync_engine, "connect", pool_metrics.on_connect)
+metrics.gauge(
+    "db_pool_size",
+    "Connections kept open by the pool",
+    callback=lambda: async_engine.sync_engine.pool.size(),
+)
+metrics.gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    callback=lambda: async_engine.sync_engine.pool.checkedout(),
+)
+metrics.gauge(
+    "db_pool_overflow",
+    "Connections opened beyond the pool size",
+    callback=lambda: async_engine.sync_engine.pool.overflow(),
+)
+metrics.counter(
+    "db_pool_checkouts_total",
+    "Connections checked out of the pool",
+    callback=lambda: pool_metrics.checkouts_total,
+)
+metrics.counter(
+    "db_pool_connects_total",
+    "New database connections opened by the pool",
+    callback=lambda: pool_metrics.connects_total,
+)
+
+
+async def _checkout_connection(session: AsyncSession):
+    # check out the connection up front to measure how long we waited on the pool
+    start = time.perf_counter()
+    await session.connection()
+    pool_metrics.observe_wait(time.perf_counter() - start)
+
+
+def async_read(func):
+    """
+    Runs `func` on its own session, returning the connection to the pool as soon as it is done.
+
+    Use for reads that may run concurrently, sessions must not be shared between concurrent tasks.
+    """
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with async_session() as session:
+            await _checkout_connection(session)
+            return await func(*args, **kwargs, session=session)
+
+    return wrapper
+
+
+_AFTER_COMMIT_KEY = "after_commit"
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]):
+    """
+    Runs `callback` once the `async_transaction` of `session` has committed, e.g. to invalidate cache entries the
+    transaction made stale. Nothing runs if the transaction is rolled back.
+    """
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
 def async_transaction(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
         async with async_session() as session:
             async with session.begin():
+                await _checkout_connection(session)
                 try:
                     called = await func(*args, **kwargs, session=session)
                     await session.commit()
-                    return called
                 except SQLAlchemyError as e:
                     await session.rollback()
                     raise e
+            # a concurrent read before the commit would put the old row back in an invalidated cache
+            for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+                await callback()
+            return called
 
     return wrapper
@@ -0,0 +1,62 @@
+"""
+Backfills the forecast archive with every 24 hour forecast published between two dates.
+
+Dates are read concurrently, bounded by `WEATHER_MAX_CONCURRENT_REQUESTS`, and records are archived in batches of
+`FORECAST_ARCHIVE_BATCH_SIZE` as they arrive. Records that are already archived are skipped, so the command can be
+re-run over overlapping ranges.
+
+Usage (from the backend directory):
+    python -m src.microservices.weather_bot.backfill --date-from 2025-03-01 --date-to 2025-03-31
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+from src.connectors.weather import WeatherConnector
+from src.core.fetch import close_async_client
+from .utils.archive import ForecastArchiver
+
+
+async def backfill(date_from: datetime.date, date_to: datetime.date):
+    connector = WeatherConnector()
+    archiver = ForecastArchiver()
+    dates = [
+        date_from + datetime.timedelta(days=days)
+        for days in range((date_to - date_from).days + 1)
+    ]
+
+    start = time.perf_counter()
+    fetched = 0
+    archived = 0
+    try:
+        async for record in connector.iter_24_hour_forecasts_for_dates(dates):
+            fetched += 1
+            archiver.add([record])
+            if archiver.pending_count >= archiver.batch_size:
+                archived += await archiver.flush()
+        archived += await archiver.flush(final=True)
+    finally:
+        await close_async_client()
+    print(
+        f"Forecast Backfill - {len(dates)} days, {fetched} records fetched, "
+        f"{archived} archived in {time.perf_counter() - start:.1f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--date-from", type=datetime.date.fromisoformat, required=True)
+    parser.add_argument(
+        "--date-to",
+        type=datetime.date.fromisoformat,
+        default=datetime.date.today(),
+    )
+    args = parser.parse_args()
+    if args.date_from > args.date_to:
+        parser.error("--date-from must not be after --date-to")
+    asyncio.run(backfill(args.date_from, args.date_to))
+
+
+if __name__ == "__main__":
+    main()
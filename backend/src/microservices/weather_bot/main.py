@@ -1,11 +1,17 @@
+import asyncio
 import os
 import signal
+import uvicorn
 from telegram import Update
 from telegram.ext import (
     Application,
 )
 
+from src.core.cache import cache_backend
 from src.core.config import settings
+from src.core.fetch import close_async_client
+from src.core.metrics import metrics, start_metrics_server
+from src.schemas.telegram import TelegramUpdateModeEnum
 from .services.weather import (
     WeatherService,
     WeatherConversationDirector,
@@ -14,13 +20,36 @@ from .services.telegram import (
     TelegramService,
     TelegramServiceDirector,
 )
+from .utils.update_processor import ChatOrderedUpdateProcessor
+from .webhook import create_webhook_app
 
-application = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
+
+async def post_shutdown(_: Application):
+    await weather_convo.user_tracker.flush()
+    await weather_convo.forecast_archiver.flush(final=True)
+    await weather_convo.partitioner.leave()
+    await close_async_client()
+    await cache_backend.close()
+
+
+application = (
+    Application.builder()
+    .token(settings.TELEGRAM_BOT_TOKEN)
+    .update_queue(asyncio.Queue(maxsize=settings.TELEGRAM_UPDATE_QUEUE_SIZE))
+    # updates of one chat stay in order, so conversations never see their own updates out of order
+    .concurrent_updates(
+        ChatOrderedUpdateProcessor()
+        if settings.TELEGRAM_CONCURRENT_UPDATES > 1
+        else False
+    )
+    .post_shutdown(post_shutdown)
+    .build()
+)
 count = 0
 max_retry_count = 5
 
 weather_convo = WeatherService()
-telegram_service = TelegramService()
+telegram_service = TelegramService(user_tracker=weather_convo.user_tracker)
 
 weather_convo_director = WeatherConversationDirector(
     application=application,
@@ -32,12 +61,27 @@ telegram_service_director = TelegramServiceDirector(
     weather_service=weather_convo,
 )
 
+metrics.gauge(
+    "telegram_update_queue_size",
+    "Updates received but not yet picked up by the application.",
+    callback=application.update_queue.qsize,
+)
+
 
 def main():
     try:
-        # TODO: Redis init and integration for caching user data
         weather_convo_director.construct()
         telegram_service_director.construct()
+        if settings.TELEGRAM_UPDATE_MODE == TelegramUpdateModeEnum.WEBHOOK.value:
+            uvicorn.run(
+                create_webhook_app(application),
+                host=settings.TELEGRAM_WEBHOOK_HOST,
+                port=settings.TELEGRAM_WEBHOOK_PORT,
+            )
+            return
+        if settings.METRICS_ENABLED:
+            # polling mode has no web server of its own
+            start_metrics_server(settings.METRICS_HOST, settings.METRICS_PORT)
         application.run_polling(
             allowed_updates=Update.ALL_TYPES,
             drop_pending_updates=True,
@@ -1,22 +1,62 @@
+import asyncio
 import datetime
+import time
 from typing import List
 from telegram.ext import Application, ContextTypes
 from .weather import WeatherService
-from src.schemas.telegram import TelegramAddJobSchema
+from src.core.config import settings
+from src.schemas.telegram import TelegramAddJobSchema, TelegramPurgeSummarySchema
 from src.core.depends import Depends
+from src.repository.preferences import PreferencesRepository
 from src.repository.telegram import TelegramRepository
 from ..utils.director import BaseDirector
+from ..utils.user_tracker import UserTracker
 
 
 class TelegramService:
     def __init__(
         self,
         telegram_repo: TelegramRepository = Depends(TelegramRepository),
+        preferences_repo: PreferencesRepository = Depends(PreferencesRepository),
+        user_tracker: UserTracker = Depends(UserTracker),
     ):
         self.telegram_repo = telegram_repo
+        self.preferences_repo = preferences_repo
+        # has to be the tracker of the conversation handlers, a purged user would otherwise stay known there
+        self.user_tracker = user_tracker
 
-    async def clean_up_user(self, _: ContextTypes.DEFAULT_TYPE):
-        await self.telegram_repo.hard_delete_telegram_users()
+    async def clean_up_user(
+        self, _: ContextTypes.DEFAULT_TYPE
+    ) -> TelegramPurgeSummarySchema:
+        """
+        Permanently deletes users that unsubscribed more than `USER_PURGE_RETENTION_DAYS` ago.
+
+        Rows are deleted in short transactions of `USER_PURGE_BATCH_SIZE`, yielding to the event loop and the
+        database between batches, so the purge does not hold locks that stall live updates.
+        """
+        updated_before = datetime.datetime.now() - datetime.timedelta(
+            days=settings.USER_PURGE_RETENTION_DAYS
+        )
+        summary = TelegramPurgeSummarySchema()
+        start = time.perf_counter()
+        while True:
+            user_ids = await self.telegram_repo.hard_delete_telegram_users(
+                updated_before,
+                settings.USER_PURGE_BATCH_SIZE,
+            )
+            self.user_tracker.forget(user_ids)
+            await self.preferences_repo.invalidate_cached_preferences(user_ids)
+            summary.batches += 1
+            summary.purged += len(user_ids)
+            if len(user_ids) < settings.USER_PURGE_BATCH_SIZE:
+                break
+            await asyncio.sleep(settings.USER_PURGE_BATCH_PAUSE_SECONDS)
+        summary.duration_seconds = time.perf_counter() - start
+        print(
+            f"User Clean Up - purged {summary.purged} users in {summary.batches} batches, "
+            f"{summary.duration_seconds:.1f}s"
+        )
+        return summary
 
 
 class TelegramServiceDirector(BaseDirector):
@@ -55,6 +95,21 @@ class TelegramServiceDirector(BaseDirector):
                 interval=datetime.timedelta(hours=24),
             )
         )
+        self.__add_job(
+            TelegramAddJobSchema(
+                callback=self.weather_service.load_alert_schedules,
+                interval=datetime.timedelta(hours=settings.ALERT_SCHEDULE_RELOAD_HOURS),
+                first=0,
+            )
+        )
+        # alert users at the start of their alert window, aligned to the start of each minute
+        self.__add_job(
+            TelegramAddJobSchema(
+                callback=self.weather_service.send_scheduled_alerts,
+                interval=datetime.timedelta(minutes=1),
+                first=60 - datetime.datetime.now().second,
+            )
+        )
         # check and send weather updates every hour to subscribed users
         self.__add_job(
             TelegramAddJobSchema(
@@ -64,4 +119,15 @@ class TelegramServiceDirector(BaseDirector):
             )
         )
 
+        if self.weather_service.partitioner.is_sharded:
+            self.__add_job(
+                TelegramAddJobSchema(
+                    callback=self.weather_service.refresh_broadcast_partitions,
+                    interval=datetime.timedelta(
+                        seconds=settings.BROADCAST_INSTANCE_HEARTBEAT_SECONDS
+                    ),
+                    first=0,
+                )
+            )
+
         self.__run_all_jobs()
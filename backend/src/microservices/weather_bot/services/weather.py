@@ -1,4 +1,3 @@
-import asyncio
 import datetime
 import re
 from typing import List
@@ -18,21 +17,43 @@ from telegram.ext import (
     filters,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.config import settings
+from src.core.depends import Depends
 from src.core.sql import async_transaction
 from src.core.regex import TWENTY_FOUR_HOUR_TIME_REGEX
 from src.core.formatting import toddmmYYYYHHMM
+from src.repository.broadcast import BroadcastRepository
+from src.repository.forecast import ForecastArchiveRepository
+from src.schemas.preferences import (
+    DEFAULT_ALERT_START_TIME,
+    DEFAULT_UTC_OFFSET_MINUTES,
+    PreferencesRepositorySchema,
+)
 from src.schemas.weather import (
-    TwentyFourHourSchema,
+    ForecastChangeSchema,
+    ForecastChangeTypeEnum,
+    ForecastTextEnum,
+    RecordSchema,
+    RegionEnum,
+    TimePeriodSchema,
     rain_forecast_list,
 )
 from src.schemas.telegram import (
-    TelegramPreferenceRepositorySchema,
+    TelegramAlertSchedule,
     TelegramWeatherCommandsEnum,
     TelegramWeatherConfigEnum,
     TelegramWeatherConversationStatesEnum,
+    TelegramUserMetadata,
 )
+from ..utils.archive import ForecastArchiver
+from ..utils.broadcast import BroadcastEngine
 from ..utils.builder import BaseConversationBuilder
 from ..utils.director import BaseDirector
+from ..utils.forecast_diff import diff_forecasts
+from ..utils.metrics import instrument_handler, telegram_tracked_users_total
+from ..utils.partition import BroadcastPartitioner, shard_of
+from ..utils.scheduler import AlertScheduler, utc_minute_of_day
+from ..utils.user_tracker import UserTracker, UserTrackingStatusEnum
 
 
 # TODO: Exception handling
@@ -45,13 +66,46 @@ class WeatherService(BaseConversationBuilder):
     Application Package - https://docs.python-telegram-bot.org/en/v21.10/telegram.ext.application.html
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        broadcast_engine: BroadcastEngine = Depends(BroadcastEngine),
+        user_tracker: UserTracker = Depends(UserTracker),
+        broadcast_repo: BroadcastRepository = Depends(BroadcastRepository),
+        partitioner: BroadcastPartitioner = Depends(BroadcastPartitioner),
+        alert_scheduler: AlertScheduler = Depends(AlertScheduler),
+        forecast_archiver: ForecastArchiver = Depends(ForecastArchiver),
+        forecast_repo: ForecastArchiveRepository = Depends(ForecastArchiveRepository),
+    ):
         super().__init__()
+        self.broadcast_engine = broadcast_engine
+        self.user_tracker = user_tracker
+        self.broadcast_repo = broadcast_repo
+        self.partitioner = partitioner
+        self.alert_scheduler = alert_scheduler
+        self.forecast_archiver = forecast_archiver
+        self.forecast_repo = forecast_repo
+        # forecast changes that are broadcast, anything else is left for the scheduled alerts
+        self.alert_transitions = {
+            ForecastChangeTypeEnum(transition)
+            for transition in settings.FORECAST_ALERT_TRANSITIONS
+        }
         self.end_convo_keyboard = [
             TelegramWeatherConversationStatesEnum.END_CONVERSATION.value
         ]
-        # init user_data with last_updated in memory to prevent multiple similar notifications
+        # keyboard label -> region, None for all of Singapore
+        self.region_options: dict[str, RegionEnum | None] = {
+            "All of Singapore": None,
+            **{region.value.capitalize(): region for region in RegionEnum},
+        }
+        # last forecast handled by this process, saves a database round trip when nothing changed.
+        # Whether a forecast was already broadcast is decided by `broadcast_repo`, shared by all replicas.
         self.last_updated: datetime.datetime | None = None
+        # shards of `last_updated` this process already tried to claim
+        self.handled_shards: set[int] = set()
+        # changes of `last_updated` from the forecast published before it
+        self.last_changes: List[ForecastChangeSchema] = []
+        # last UTC minute whose scheduled alerts were processed
+        self.last_alert_tick: datetime.datetime | None = None
 
     async def __set_commands(self, context: ContextTypes.DEFAULT_TYPE):
         command_description_map = {
@@ -87,13 +141,19 @@ class WeatherService(BaseConversationBuilder):
         return ConversationHandler.END
 
     @async_transaction
-    async def track_users(
-        self, update: Update, _: ContextTypes.DEFAULT_TYPE, session: AsyncSession
-    ):
+    async def __register_user(
+        self, user_metadata: TelegramUserMetadata, session: AsyncSession
+    ) -> bool:
+        return await self.telegram_repo.upsert_telegram_user_with_preferences(
+            *user_metadata,
+            session=session,
+        )
+
+    async def track_users(self, update: Update, _: ContextTypes.DEFAULT_TYPE):
         if not update.message or not update.message.from_user:
             return
 
-        user_metadata = (
+        user_metadata = TelegramUserMetadata(
             str(update.message.from_user.id),
             str(update.message.chat_id),
             update.message.from_user.username,
@@ -103,21 +163,44 @@ class WeatherService(BaseConversationBuilder):
         if update.message.from_user.is_bot:
             return
 
-        await self.telegram_repo.upsert_telegram_user(
-            *user_metadata,
-            session=session,
-        )
-        user_preference = await self.preferences_repo.get_user_preference(
-            str(update.message.from_user.id),
-        )
-        if not user_preference:
-            await self.preferences_repo.create_preferences(
-                user_id=str(update.message.from_user.id),
-                alert_start_time="07:00",
-                alert_end_time="22:00",
-                session=session,
+        # known users are skipped or written behind, only first contact hits the database right away
+        status = self.user_tracker.track(user_metadata)
+        telegram_tracked_users_total.inc(status=status.value)
+        if status != UserTrackingStatusEnum.UNKNOWN:
+            return
+        is_new = await self.__register_user(user_metadata)
+        self.user_tracker.mark_persisted(user_metadata)
+        if is_new:
+            self.alert_scheduler.upsert(
+                TelegramAlertSchedule(
+                    user_metadata.user_id,
+                    user_metadata.chat_id,
+                    DEFAULT_ALERT_START_TIME,
+                    DEFAULT_UTC_OFFSET_MINUTES,
+                )
             )
 
+    async def flush_tracked_users(self, context: ContextTypes.DEFAULT_TYPE):
+        await self.user_tracker.flush(context)
+
+    def __schedule_alerts(
+        self,
+        user_id: str,
+        chat_id: str,
+        preference: PreferencesRepositorySchema,
+    ):
+        self.alert_scheduler.upsert(
+            TelegramAlertSchedule(
+                user_id,
+                chat_id,
+                preference.alert_start_time or DEFAULT_ALERT_START_TIME,
+                DEFAULT_UTC_OFFSET_MINUTES
+                if preference.utc_offset_minutes is None
+                else preference.utc_offset_minutes,
+                preference.region and preference.region.value,
+            )
+        )
+
     async def start_conversation(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ):
@@ -161,6 +244,7 @@ I will notify you when the skies are being unfriendly.
             chat_id=str(update.message.chat_id),
             is_deleted=True,
         )
+        self.alert_scheduler.remove(str(update.message.from_user.id))
         await update.message.reply_html(
             """
           You have successfully unsubscribed from receiving Singapore Weather Bot updates.
@@ -189,6 +273,9 @@ I will notify you when the skies are being unfriendly.
             chat_id=user.chat_id,
             is_deleted=False,
         )
+        user_preference = await self.preferences_repo.get_user_preference(user.user_id)
+        if user_preference:
+            self.__schedule_alerts(user.user_id, user.chat_id, user_preference)
         await update.message.reply_text(
             """
         Welcome back, I knew you will be back. You have successfully resubscribed to Singapore Weather Bot updates.
@@ -204,10 +291,11 @@ I will notify you when the skies are being unfriendly.
         """
         Entry point for configuring notification settings.
 
-        User has three options to choose from:
+        User has four options to choose from:
         1. Start time of alerts
         2. End time of alerts
-        3. End conversation
+        3. Region of alerts
+        4. End conversation
 
         Proceeds to `SELECTING_NOTIFICATION_OPTION` state
         """
@@ -219,6 +307,7 @@ I will notify you when the skies are being unfriendly.
         keyboard = [
             [TelegramWeatherConfigEnum.ALERT_START_TIME.value],
             [TelegramWeatherConfigEnum.ALERT_END_TIME.value],
+            [TelegramWeatherConfigEnum.REGION.value],
             self.end_convo_keyboard,
         ]
         await update.message.reply_text(
@@ -232,7 +321,7 @@ I will notify you when the skies are being unfriendly.
     ) -> TelegramWeatherConversationStatesEnum | int:
         """
         Processes the selected option from the user and replies accordinly.
-        Proceeds to `ALERT_TIME` state or ends the conversation.
+        Proceeds to `ALERT_TIME` or `REGION` state or ends the conversation.
         """
         if (
             not update.message
@@ -255,6 +344,19 @@ I will notify you when the skies are being unfriendly.
             )
             return TelegramWeatherConversationStatesEnum.SELECTING_NOTIFICATION_OPTION
 
+        if TelegramWeatherConfigEnum.REGION.value == selected_option:
+            await update.message.reply_html(
+                """
+            Please select the region of Singapore you would like to receive alerts for.
+            \n<strong>Alerts for all of Singapore are based on the island-wide forecast.</strong>
+            """,
+                reply_markup=ReplyKeyboardMarkup(
+                    [[option] for option in self.region_options]
+                    + [self.end_convo_keyboard]
+                ),
+            )
+            return TelegramWeatherConversationStatesEnum.REGION
+
         selected_option_instruction_map = {
             TelegramWeatherConfigEnum.ALERT_START_TIME.value: """
             Please specify the start time you would like to start receiving alerts.
@@ -313,7 +415,7 @@ I will notify you when the skies are being unfriendly.
         if not user_preference:
             return TelegramWeatherConversationStatesEnum.FALLBACK
 
-        params = {**user_preference.model_dump()}
+        params = {**user_preference.model_dump(exclude={"region"})}
         selected_option = str(
             context.user_data and context.user_data["selected_option"]
         )
@@ -326,6 +428,11 @@ I will notify you when the skies are being unfriendly.
         await self.preferences_repo.update_preferences(
             **params,
         )
+        self.__schedule_alerts(
+            str(update.message.from_user.id),
+            str(update.message.chat_id),
+            PreferencesRepositorySchema(**params, region=user_preference.region),
+        )
 
         return await self.__end_conversation(
             update,
@@ -334,6 +441,50 @@ I will notify you when the skies are being unfriendly.
             \n<i>Conversation ended</i>""",
         )
 
+    async def configure_region(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> TelegramWeatherConversationStatesEnum | int:
+        if (
+            not update.message
+            or not update.message.from_user
+            or not update.message.text
+        ):
+            return TelegramWeatherConversationStatesEnum.FALLBACK
+
+        if (
+            TelegramWeatherConversationStatesEnum.END_CONVERSATION.value
+            == update.message.text
+        ):
+            return await self.__end_conversation(update, context)
+
+        user_input = update.message.text
+        if user_input not in self.region_options:
+            await update.message.reply_text(
+                "What is this gibberish? Please select a valid region.",
+            )
+            return TelegramWeatherConversationStatesEnum.REGION
+
+        user_id = str(update.message.from_user.id)
+        user_preference = await self.preferences_repo.get_user_preference(user_id)
+        if not user_preference:
+            return TelegramWeatherConversationStatesEnum.FALLBACK
+
+        region = self.region_options[user_input]
+        await self.preferences_repo.update_region(user_id, region)
+        user_preference.region = region
+        self.__schedule_alerts(
+            user_id,
+            str(update.message.chat_id),
+            user_preference,
+        )
+
+        return await self.__end_conversation(
+            update,
+            context,
+            message=f"""{TelegramWeatherConfigEnum.REGION.value} - updated to {user_input}.
+            \n<i>Conversation ended</i>""",
+        )
+
     async def fallback_conversation(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ):
@@ -345,15 +496,169 @@ I will notify you when the skies are being unfriendly.
 
     ########### End of Configure Notifications Conversation ###########
 
-    def __get_weather_update(self):
-        now = datetime.datetime.now()
-        return self.weather_connector.get_24_hour_forecast_sg(now)
+    async def __get_weather_update(self, allow_stale: bool = False):
+        # latest forecast, served from the connector cache within its TTL
+        return await self.weather_connector.get_24_hour_forecast_sg(
+            allow_stale=allow_stale
+        )
+
+    def __is_going_to_rain(self, record: RecordSchema) -> bool:
+        return record.general.forecast.text in rain_forecast_list
+
+    def __rainy_periods_by_region(
+        self, record: RecordSchema
+    ) -> dict[RegionEnum, List[tuple[TimePeriodSchema, ForecastTextEnum]]]:
+        """
+        Rainy periods of the forecast that have not ended yet, grouped by region.
+        """
+        now = datetime.datetime.now(datetime.UTC)
+        rainy_periods: dict[
+            RegionEnum, List[tuple[TimePeriodSchema, ForecastTextEnum]]
+        ] = {}
+        for period in record.periods:
+            if period.timePeriod.end <= now:
+                continue
+            for region in RegionEnum:
+                forecast = getattr(period.regions, region.value).text
+                if forecast in rain_forecast_list:
+                    rainy_periods.setdefault(region, []).append(
+                        (period.timePeriod, forecast)
+                    )
+        return rainy_periods
+
+    def __render_forecast_message(self, record: RecordSchema) -> str:
+        valid_period = record.general.validPeriod
+        forecast = record.general.forecast.text
+
+        return f"""
+        It seems like the weather is going to be unfriendly today ⛈️.
+        \nCurrent forecast: <strong>{forecast.value}</strong>
+        \nTemperatures: <strong>{record.general.temperature.low}°C - {record.general.temperature.high}°C</strong>
+        \nForecast validity: <strong>{toddmmYYYYHHMM(valid_period.start)}</strong> - <strong>{toddmmYYYYHHMM(valid_period.end)}</strong>
+Last updated: <i>{toddmmYYYYHHMM(record.updatedTimestamp)}</i>.
+        """
+
+    def __render_region_forecast_message(
+        self,
+        record: RecordSchema,
+        region: RegionEnum,
+        rainy_periods: List[tuple[TimePeriodSchema, ForecastTextEnum]],
+    ) -> str:
+        forecasts = "".join(
+            f"\n{period.text}: <strong>{forecast.value}</strong>"
+            for period, forecast in rainy_periods
+        )
+        return f"""
+        It seems like the weather is going to be unfriendly in the {region.value} today ⛈️.
+        {forecasts}
+        \nTemperatures: <strong>{record.general.temperature.low}°C - {record.general.temperature.high}°C</strong>
+Last updated: <i>{toddmmYYYYHHMM(record.updatedTimestamp)}</i>.
+        """
+
+    def __render_forecast_messages(
+        self, record: RecordSchema
+    ) -> dict[RegionEnum | None, str]:
+        """
+        Works out which regions are going to be rainy and renders one message for each of them, keyed by region.
+        The `None` key holds the island-wide message for users without a region. Regions that stay dry are left out.
+        """
+        messages: dict[RegionEnum | None, str] = {}
+        if self.__is_going_to_rain(record):
+            messages[None] = self.__render_forecast_message(record)
+        for region, rainy_periods in self.__rainy_periods_by_region(record).items():
+            messages[region] = self.__render_region_forecast_message(
+                record, region, rainy_periods
+            )
+        return messages
+
+    def __render_change_message(
+        self,
+        record: RecordSchema,
+        region: RegionEnum | None,
+        changes: List[ForecastChangeSchema],
+    ) -> str:
+        area = f"the {region.value}" if region else "Singapore"
+        if all(
+            change.change_type
+            in (
+                ForecastChangeTypeEnum.RAIN_CLEARED,
+                ForecastChangeTypeEnum.SEVERITY_DE_ESCALATION,
+            )
+            for change in changes
+        ):
+            heading = f"Good news, the weather in {area} is looking up 🌤."
+        else:
+            heading = f"It seems like the weather in {area} is turning unfriendly ⛈️."
+        forecasts = "".join(
+            f"\n{change.period.text}: <strong>{change.current.value}</strong>"
+            + (f" (was {change.previous.value})" if change.previous else "")
+            for change in changes
+        )
+        return f"""
+        {heading}
+        {forecasts}
+        \nTemperatures: <strong>{record.general.temperature.low}°C - {record.general.temperature.high}°C</strong>
+Last updated: <i>{toddmmYYYYHHMM(record.updatedTimestamp)}</i>.
+        """
+
+    def __render_change_messages(
+        self,
+        record: RecordSchema,
+        changes: List[ForecastChangeSchema],
+    ) -> dict[RegionEnum | None, str]:
+        """
+        Renders one message per region with changes to periods that have not ended yet, keyed by region.
+        """
+        now = datetime.datetime.now(datetime.UTC)
+        region_changes: dict[RegionEnum | None, List[ForecastChangeSchema]] = {}
+        for change in changes:
+            if change.period.end <= now:
+                continue
+            region_changes.setdefault(change.region, []).append(change)
+        return {
+            region: self.__render_change_message(record, region, changes)
+            for region, changes in region_changes.items()
+        }
 
-    def __is_going_to_rain(self, forecast: TwentyFourHourSchema) -> bool:
-        return forecast.data.records[0].general.forecast.text in rain_forecast_list
+    async def __alerting_changes(
+        self, record: RecordSchema
+    ) -> List[ForecastChangeSchema]:
+        """
+        Changes from the previously archived forecast to `record` whose type is one of `alert_transitions`.
+        Every replica diffs against the same archived forecast, so they agree on what to broadcast.
+        """
+        previous = await self.forecast_repo.get_latest_record_before(
+            record.updatedTimestamp
+        )
+        return [
+            change
+            for change in diff_forecasts(previous, record)
+            if change.change_type in self.alert_transitions
+        ]
 
-    def __set_last_updated(self, dt: datetime.datetime):
+    def __set_last_updated(
+        self, dt: datetime.datetime, changes: List[ForecastChangeSchema]
+    ):
         self.last_updated = dt
+        self.last_changes = changes
+        self.handled_shards = set()
+
+    async def __claim_shards(self, updated_timestamp: datetime.datetime) -> List[int]:
+        """
+        Claims the broadcast of `updated_timestamp` for every shard this instance owns and has not handled yet.
+        """
+        claimed_shards = []
+        for shard in self.partitioner.owned_shards:
+            if shard in self.handled_shards:
+                continue
+            if await self.broadcast_repo.claim_forecast(
+                updated_timestamp,
+                settings.INSTANCE_ID,
+                shard=shard,
+            ):
+                claimed_shards.append(shard)
+            self.handled_shards.add(shard)
+        return claimed_shards
 
     # async def send_weather_update(self):
     #     """
@@ -366,42 +671,150 @@ I will notify you when the skies are being unfriendly.
         """
         Method to send push notification to all users subscribed to weather updates.
         """
-        current_forecast = self.__get_weather_update()
+        current_forecast = await self.__get_weather_update()
         if not current_forecast:
             return
+        # every distinct forecast is archived, rainy or not
+        self.forecast_archiver.add(current_forecast.data.records)
+        await self.forecast_archiver.flush()
+
         record = current_forecast.data.records[0]
-        valid_period = record.general.validPeriod
-        forecast = record.general.forecast.text
+        if self.last_updated != record.updatedTimestamp:
+            self.__set_last_updated(
+                record.updatedTimestamp,
+                await self.__alerting_changes(record),
+            )
+        # re-publishes without a meaningful change are not broadcast
+        messages = self.__render_change_messages(record, self.last_changes)
+        if not messages:
+            return
+        claimed_shards = await self.__claim_shards(record.updatedTimestamp)
+        if not claimed_shards:
+            return
 
-        message = f"""
-        It seems like the weather is going to be unfriendly today ⛈️.
-        \nCurrent forecast: <strong>{forecast.value}</strong>
-        \nTemperatures: <strong>{record.general.temperature.low}°C - {record.general.temperature.high}°C</strong>
-        \nForecast validity: <strong>{toddmmYYYYHHMM(valid_period.start)}</strong> - <strong>{toddmmYYYYHHMM(valid_period.end)}</strong>
-Last updated: <i>{toddmmYYYYHHMM(record.updatedTimestamp)}</i>.
+        async def list_chat_ids(region: RegionEnum | None):
+            batches = self.telegram_repo.stream_subscribed_users_within_timeframe(
+                shards=claimed_shards,
+                shard_count=self.partitioner.shard_count,
+                regions=[region],
+            )
+            async for recipients in batches:
+                for recipient in recipients:
+                    yield recipient.chat_id
+
+        # only subscribers of a changed region are streamed, each with the message of their region
+        for region, message in messages.items():
+            await self.broadcast_engine.broadcast(
+                bot=context.bot,
+                chat_ids=list_chat_ids(region),
+                text=message,
+            )
+
+    async def load_alert_schedules(self, _: ContextTypes.DEFAULT_TYPE):
+        """
+        (Re)builds the alert schedule from the database. Changes made through this process are applied
+        incrementally, a periodic reload picks up changes made through other replicas.
         """
+        await self.alert_scheduler.load(self.telegram_repo.list_alert_schedules)
+        print(f"Alert Scheduler - loaded {len(self.alert_scheduler)} users")
+
+    def __pending_alert_ticks(self, now: datetime.datetime) -> List[datetime.datetime]:
+        current_tick = now.replace(second=0, microsecond=0)
+        if not self.last_alert_tick:
+            return [current_tick]
+        # catch up on minutes skipped by a delayed job, within reason
+        missed_minutes = int(
+            (current_tick - self.last_alert_tick).total_seconds() // 60
+        )
+        return [
+            current_tick - datetime.timedelta(minutes=minutes)
+            for minutes in reversed(range(min(missed_minutes, 5)))
+        ]
 
-        if (
-            self.__is_going_to_rain(current_forecast)
-            and self.last_updated != record.updatedTimestamp
-        ):
-            user_list: List[
-                TelegramPreferenceRepositorySchema
-            ] = await self.telegram_repo.list_subscribed_users_within_timeframe()
-            self.__set_last_updated(record.updatedTimestamp)
-
-            async def send_message(user: TelegramPreferenceRepositorySchema):
-                # TODO: add functionality for user to receive locational weather updates with button selection
-                await context.bot.send_message(
-                    chat_id=user.telegram.chat_id,
-                    text=message,
-                    parse_mode="HTML",
-                )
+    def __due_schedules_by_shard(
+        self, tick_at: datetime.datetime
+    ) -> dict[int, List[TelegramAlertSchedule]]:
+        shard_schedules: dict[int, List[TelegramAlertSchedule]] = {}
+        for schedule in self.alert_scheduler.due(tick_at.hour * 60 + tick_at.minute):
+            if not self.partitioner.owns(schedule.user_id):
+                continue
+            shard = (
+                shard_of(schedule.user_id, self.partitioner.shard_count)
+                if self.partitioner.is_sharded
+                else 0
+            )
+            shard_schedules.setdefault(shard, []).append(schedule)
+        return shard_schedules
 
-            if len(user_list) == 0:
-                return
-            # Similar to nodejs Promise.all, must check length, if len == 0, it will forever await.
-            await asyncio.gather(*[send_message(user) for user in user_list])
+    async def __current_due_schedules(
+        self, tick_at: datetime.datetime, schedules: List[TelegramAlertSchedule]
+    ) -> List[TelegramAlertSchedule]:
+        """
+        Checks schedules taken from the in-memory index against the database. Another replica may have changed the
+        preferences of a user or unsubscribed them since the index was last loaded.
+
+        :return: current schedules of the users that are still due at `tick_at`
+        """
+        current = await self.telegram_repo.list_alert_schedules(
+            [schedule.user_id for schedule in schedules]
+        )
+        minute = tick_at.hour * 60 + tick_at.minute
+        return [
+            schedule
+            for schedule in current
+            if utc_minute_of_day(schedule.alert_start_time, schedule.utc_offset_minutes)
+            == minute
+        ]
+
+    async def send_scheduled_alerts(self, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Runs every minute and alerts only the users whose alert window opens in that minute, with the
+        current cached forecast. Each minute and shard is claimed so replicas do not alert the same users twice,
+        the claimed users are checked against the database before they are alerted.
+        """
+        ticks = self.__pending_alert_ticks(datetime.datetime.now(datetime.UTC))
+        if not ticks:
+            return
+        self.last_alert_tick = ticks[-1]
+        due = {tick_at: self.__due_schedules_by_shard(tick_at) for tick_at in ticks}
+        if not any(due.values()):
+            return
+
+        # runs every minute, answer from cache right away and revalidate in the background
+        current_forecast = await self.__get_weather_update(allow_stale=True)
+        if not current_forecast:
+            return
+        messages = self.__render_forecast_messages(current_forecast.data.records[0])
+        if not messages:
+            return
+
+        region_chat_ids: dict[RegionEnum | None, List[str]] = {}
+        for tick_at, shard_schedules in due.items():
+            for shard, schedules in shard_schedules.items():
+                if not await self.broadcast_repo.claim_alert_tick(
+                    tick_at,
+                    settings.INSTANCE_ID,
+                    shard=shard,
+                ):
+                    continue
+                for schedule in await self.__current_due_schedules(tick_at, schedules):
+                    region = schedule.region and RegionEnum(schedule.region)
+                    if region in messages:
+                        region_chat_ids.setdefault(region, []).append(schedule.chat_id)
+        for region, chat_ids in region_chat_ids.items():
+            await self.broadcast_engine.broadcast(
+                bot=context.bot,
+                chat_ids=chat_ids,
+                text=messages[region],
+            )
+
+    async def refresh_broadcast_partitions(self, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Heartbeat job for sharded broadcasts. Shards taken over from a replica that went away are sent the
+        current forecast right away instead of waiting for the next scheduled run.
+        """
+        if await self.partitioner.refresh():
+            await self.send_weather_update_to_users(context)
 
 
 class WeatherConversationDirector(BaseDirector):
@@ -418,43 +831,65 @@ class WeatherConversationDirector(BaseDirector):
             entry_points=[
                 CommandHandler(
                     TelegramWeatherCommandsEnum.CONFIGURE.value,
-                    self.service.configure_notifications,
+                    instrument_handler(
+                        self.service.configure_notifications,
+                        TelegramWeatherCommandsEnum.CONFIGURE.value,
+                    ),
                 )
             ],
             states={
                 TelegramWeatherConversationStatesEnum.SELECTING_NOTIFICATION_OPTION: [
                     MessageHandler(
                         filters.TEXT,
-                        self.service.selected_option,
+                        instrument_handler(
+                            self.service.selected_option,
+                            "selecting_notification_option",
+                        ),
                     ),
                 ],
                 TelegramWeatherConversationStatesEnum.ALERT_TIME: [
                     MessageHandler(
                         filters.TEXT,
-                        self.service.configure_alert_time,
+                        instrument_handler(
+                            self.service.configure_alert_time, "alert_time"
+                        ),
+                    ),
+                ],
+                TelegramWeatherConversationStatesEnum.REGION: [
+                    MessageHandler(
+                        filters.TEXT,
+                        instrument_handler(self.service.configure_region, "region"),
                     ),
                 ],
                 TelegramWeatherConversationStatesEnum.FALLBACK: [
                     MessageHandler(
                         filters.TEXT,
-                        self.service.fallback_conversation,
+                        instrument_handler(
+                            self.service.fallback_conversation, "fallback"
+                        ),
                     )
                 ],
             },
             fallbacks=[
                 MessageHandler(
                     filters.TEXT,
-                    self.service.fallback_conversation,
+                    instrument_handler(self.service.fallback_conversation, "fallback"),
                 )
             ],
         )
 
     def construct(self):
+        job_queue = self.application.job_queue
+        if job_queue:
+            job_queue.run_repeating(
+                callback=self.service.flush_tracked_users,
+                interval=settings.USER_TRACKER_FLUSH_INTERVAL_SECONDS,
+            )
         # run track_users in its own group to not interfere with the user handlers
         self.application.add_handler(
             TypeHandler(
                 Update,
-                self.service.track_users,
+                instrument_handler(self.service.track_users, "track_users"),
                 block=False,
             ),
             group=-1,
@@ -463,21 +898,30 @@ class WeatherConversationDirector(BaseDirector):
         self.application.add_handler(
             CommandHandler(
                 TelegramWeatherCommandsEnum.START.value,
-                self.service.start_conversation,
+                instrument_handler(
+                    self.service.start_conversation,
+                    TelegramWeatherCommandsEnum.START.value,
+                ),
                 block=False,
             )
         )
         self.application.add_handler(
             CommandHandler(
                 TelegramWeatherCommandsEnum.UNSUBSCRIBE.value,
-                self.service.unsubscribe,
+                instrument_handler(
+                    self.service.unsubscribe,
+                    TelegramWeatherCommandsEnum.UNSUBSCRIBE.value,
+                ),
                 block=False,
             )
         )
         self.application.add_handler(
             CommandHandler(
                 TelegramWeatherCommandsEnum.SUBSCRIBE.value,
-                self.service.subscribe,
+                instrument_handler(
+                    self.service.subscribe,
+                    TelegramWeatherCommandsEnum.SUBSCRIBE.value,
+                ),
                 block=False,
             )
         )
@@ -0,0 +1,146 @@
+import asyncio
+import datetime
+import gzip
+import time
+from collections import OrderedDict
+from typing import Iterable, List
+from src.core.archive import ArchiveStore, archive_store
+from src.core.config import settings
+from src.core.depends import Depends
+from src.repository.forecast import ForecastArchiveRepository
+from src.schemas.weather import RecordSchema
+
+ARCHIVE_KEY_PREFIX = "twenty-four-hour-forecast"
+
+
+def encode_records(records: List[RecordSchema]) -> bytes:
+    """
+    Serialises records as gzip compressed NDJSON, one record per line.
+    """
+    lines = b"\n".join(record.model_dump_json().encode() for record in records)
+    return gzip.compress(lines + b"\n")
+
+
+def decode_records(data: bytes) -> List[RecordSchema]:
+    return [
+        RecordSchema.model_validate_json(line)
+        for line in gzip.decompress(data).splitlines()
+        if line
+    ]
+
+
+class ForecastArchiver:
+    """
+    Collects distinct forecast records, keyed on `updatedTimestamp`, and archives them in batches to the
+    `forecast_archive` table and as compressed NDJSON batch files on the archive store.
+
+    The table decides which records are new, so replicas archiving the same forecast write each record, and
+    each batch file, once. Records are inserted into the table on every flush, new ones are buffered for the store
+    until a batch file of `batch_size` records is full or the oldest waited `file_interval_seconds`. Buffered records
+    that are lost with the process are still in the table.
+    """
+
+    def __init__(
+        self,
+        forecast_repo: ForecastArchiveRepository = Depends(ForecastArchiveRepository),
+        store: ArchiveStore = Depends(archive_store),
+        batch_size: int = settings.FORECAST_ARCHIVE_BATCH_SIZE,
+        file_interval_seconds: float = settings.FORECAST_ARCHIVE_FILE_INTERVAL_SECONDS,
+        max_known: int = 1024,
+    ):
+        self.forecast_repo = forecast_repo
+        self.store = store
+        self.batch_size = batch_size
+        self.file_interval_seconds = file_interval_seconds
+        self.max_known = max_known
+        self.__pending: dict[datetime.datetime, RecordSchema] = {}
+        # new in the table but not yet written to the store
+        self.__unwritten: List[RecordSchema] = []
+        # time.monotonic() when the oldest unwritten record was buffered
+        self.__unwritten_since = 0.0
+        # recently archived timestamps, spares the database records seen on every poll
+        self.__known: OrderedDict[datetime.datetime, None] = OrderedDict()
+        self.__lock = asyncio.Lock()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self.__pending)
+
+    def __batch_key(self, records: List[RecordSchema]) -> str:
+        first, last = records[0].updatedTimestamp, records[-1].updatedTimestamp
+        return (
+            f"{ARCHIVE_KEY_PREFIX}/{first.date().isoformat()}/"
+            f"{first.strftime('%Y%m%dT%H%M%S%z')}-{last.strftime('%Y%m%dT%H%M%S%z')}.ndjson.gz"
+        )
+
+    def __remember(self, records: List[RecordSchema]):
+        for record in records:
+            self.__known[record.updatedTimestamp] = None
+            self.__known.move_to_end(record.updatedTimestamp)
+        while len(self.__known) > self.max_known:
+            self.__known.popitem(last=False)
+
+    def add(self, records: Iterable[RecordSchema]):
+        for record in records:
+            if (
+                record.updatedTimestamp in self.__known
+                or record.updatedTimestamp in self.__pending
+            ):
+                continue
+            self.__pending[record.updatedTimestamp] = record
+
+    def __buffer_unwritten(self, records: Iterable[RecordSchema]):
+        records = list(records)
+        if records and not self.__unwritten:
+            self.__unwritten_since = time.monotonic()
+        self.__unwritten.extend(records)
+
+    async def __write_unwritten(self, final: bool):
+        if not self.__unwritten:
+            return
+        if (
+            not final
+            and len(self.__unwritten) < self.batch_size
+            and time.monotonic() - self.__unwritten_since < self.file_interval_seconds
+        ):
+            return
+        records = sorted(self.__unwritten, key=lambda record: record.updatedTimestamp)
+        while records:
+            batch = records[: self.batch_size]
+            try:
+                data = await asyncio.to_thread(encode_records, batch)
+                await self.store.put(self.__batch_key(batch), data)
+            except Exception as e:
+                print(f"Forecast Archiver Exception - {e}")
+                break
+            records = records[self.batch_size :]
+        self.__unwritten = records
+
+    async def flush(self, final: bool = False) -> int:
+        """
+        Archives the pending records, `batch_size` at a time. Failed batches are kept and retried on the next flush.
+
+        :param final: also write the records buffered for the store, e.g. before the process exits
+        :return: number of records that were not archived before
+        """
+        async with self.__lock:
+            records = sorted(
+                self.__pending.values(), key=lambda record: record.updatedTimestamp
+            )
+            self.__pending = {}
+            archived = 0
+            for i in range(0, len(records), self.batch_size):
+                batch = records[i : i + self.batch_size]
+                try:
+                    inserted = set(await self.forecast_repo.bulk_insert_records(batch))
+                except Exception as e:
+                    print(f"Forecast Archiver Exception - {e}")
+                    self.add(records[i:])
+                    break
+                self.__buffer_unwritten(
+                    record for record in batch if record.updatedTimestamp in inserted
+                )
+                self.__remember(batch)
+                archived += len(inserted)
+            await self.__write_unwritten(final)
+            return archived
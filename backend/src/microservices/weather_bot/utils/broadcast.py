@@ -0,0 +1,259 @@
+import asyncio
+import datetime
+import time
+from typing import AsyncIterable, Iterable
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.schemas.telegram import TelegramBroadcastSummarySchema
+
+
+class TokenBucket:
+    """
+    Async token bucket, refilled continuously at `rate` tokens per second.
+
+    Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    def __refill(self, now: float):
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.rate,
+        )
+        self.updated_at = now
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for `seconds`, used when Telegram asks us to back off.
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.__refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _BroadcastItem:
+    __slots__ = ("chat_id", "attempt")
+
+    def __init__(self, chat_id: str, attempt: int = 0):
+        self.chat_id = chat_id
+        self.attempt = attempt
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    retry_after = error.retry_after
+    if isinstance(retry_after, datetime.timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class _BroadcastRun:
+    """
+    State of a single broadcast, see `BroadcastEngine.broadcast`.
+    """
+
+    def __init__(
+        self,
+        engine: "BroadcastEngine",
+        bot: Bot,
+        text: str,
+        parse_mode: str | None,
+    ):
+        self.engine = engine
+        self.bot = bot
+        self.text = text
+        self.parse_mode = parse_mode
+        # unbounded so retries can always be requeued, backpressure is applied on `pending` instead
+        self.queue: asyncio.Queue[_BroadcastItem] = asyncio.Queue()
+        self.pending = asyncio.Semaphore(engine.workers * 4)
+        self.next_send_at: dict[str, float] = {}
+        self.retry_tasks: set[asyncio.Task] = set()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.total = 0
+
+    async def __enqueue(self, chat_id: str):
+        await self.pending.acquire()
+        self.total += 1
+        await self.queue.put(_BroadcastItem(chat_id))
+
+    async def produce(self, chat_ids: Iterable[str] | AsyncIterable[str]):
+        if isinstance(chat_ids, AsyncIterable):
+            async for chat_id in chat_ids:
+                await self.__enqueue(chat_id)
+            return
+        for chat_id in chat_ids:
+            await self.__enqueue(chat_id)
+
+    def __finish(self, succeeded: bool):
+        if succeeded:
+            self.sent += 1
+        else:
+            self.failed += 1
+        self.pending.release()
+        self.queue.task_done()
+
+    async def __requeue_later(self, item: _BroadcastItem, delay: float):
+        await asyncio.sleep(delay)
+        await self.queue.put(item)
+        # the original attempt is only marked done once its retry is queued, so `join` cannot return early
+        self.queue.task_done()
+
+    def __retry(self, item: _BroadcastItem, delay: float, reason: str):
+        if item.attempt >= self.engine.max_retries:
+            print(f"Broadcast - giving up on chat {item.chat_id}: {reason}")
+            self.__finish(False)
+            return
+        self.retried += 1
+        self.next_send_at[item.chat_id] = time.monotonic() + delay
+        task = asyncio.create_task(
+            self.__requeue_later(_BroadcastItem(item.chat_id, item.attempt + 1), delay)
+        )
+        self.retry_tasks.add(task)
+        task.add_done_callback(self.retry_tasks.discard)
+
+    async def __wait_for_chat(self, chat_id: str):
+        next_send_at = self.next_send_at.get(chat_id)
+        if next_send_at:
+            delay = next_send_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def __send(self, item: _BroadcastItem):
+        await self.__wait_for_chat(item.chat_id)
+        await self.engine.bucket.acquire()
+        self.next_send_at[item.chat_id] = (
+            time.monotonic() + self.engine.per_chat_interval_seconds
+        )
+        try:
+            await self.bot.send_message(
+                chat_id=item.chat_id,
+                text=self.text,
+                parse_mode=self.parse_mode,
+            )
+        except RetryAfter as e:
+            delay = _retry_after_seconds(e)
+            self.engine.bucket.pause(delay)
+            self.__retry(item, delay, str(e))
+            return
+        except (Forbidden, BadRequest) as e:
+            # user blocked the bot or the chat no longer exists, retrying will not help
+            print(f"Broadcast - failed to send to chat {item.chat_id}: {e}")
+            self.__finish(False)
+            return
+        except NetworkError as e:
+            self.__retry(
+                item, self.engine.retry_backoff_seconds * 2**item.attempt, str(e)
+            )
+            return
+        except Exception as e:
+            print(f"Broadcast - failed to send to chat {item.chat_id}: {e}")
+            self.__finish(False)
+            return
+        self.__finish(True)
+
+    async def work(self):
+        while True:
+            item = await self.queue.get()
+            await self.__send(item)
+
+
+broadcast_duration_seconds = metrics.histogram(
+    "broadcast_duration_seconds",
+    "Duration of a broadcast, from the first chat id to the last message delivered.",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+broadcast_messages_total = metrics.counter(
+    "broadcast_messages_total",
+    "Broadcast messages by outcome, retried counts every retry of a message.",
+    ("outcome",),
+)
+
+
+class BroadcastEngine:
+    """
+    Delivers one message to many chats while staying within Telegram's rate limits.
+
+    - A global token bucket caps the overall send rate for the bot.
+    - Each chat is paced to at most one message per `per_chat_interval_seconds`.
+    - A fixed pool of workers does the sending, so the number of coroutines does not grow with the number of chats.
+    - `RetryAfter` (flood wait) pauses the bucket and requeues the message, network errors are retried with backoff.
+
+    LINK: https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float = settings.TELEGRAM_BROADCAST_RATE_PER_SECOND,
+        workers: int = settings.TELEGRAM_BROADCAST_WORKERS,
+        per_chat_interval_seconds: float = settings.TELEGRAM_BROADCAST_PER_CHAT_INTERVAL_SECONDS,
+        max_retries: int = settings.TELEGRAM_BROADCAST_MAX_RETRIES,
+        retry_backoff_seconds: float = 1.0,
+    ):
+        self.workers = workers
+        self.per_chat_interval_seconds = per_chat_interval_seconds
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        # shared by every broadcast, the global limit applies to the bot rather than to a single broadcast
+        self.bucket = TokenBucket(rate_per_second)
+
+    async def broadcast(
+        self,
+        bot: Bot,
+        chat_ids: Iterable[str] | AsyncIterable[str],
+        text: str,
+        parse_mode: str | None = "HTML",
+    ) -> TelegramBroadcastSummarySchema:
+        """
+        Sends `text` to every chat in `chat_ids`. An async iterable is consumed lazily, sending starts with the
+        first chat id and at most `workers * 4` chats are held in memory at any time.
+        """
+        start = time.monotonic()
+        run = _BroadcastRun(self, bot, text, parse_mode)
+        workers = [asyncio.create_task(run.work()) for _ in range(self.workers)]
+        try:
+            await run.produce(chat_ids)
+            await run.queue.join()
+        finally:
+            tasks = [*workers, *run.retry_tasks]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        summary = TelegramBroadcastSummarySchema(
+            total=run.total,
+            sent=run.sent,
+            failed=run.failed,
+            retried=run.retried,
+            duration_seconds=time.monotonic() - start,
+        )
+        broadcast_duration_seconds.observe(summary.duration_seconds)
+        broadcast_messages_total.inc(summary.sent, outcome="sent")
+        broadcast_messages_total.inc(summary.failed, outcome="failed")
+        broadcast_messages_total.inc(summary.retried, outcome="retried")
+        print(
+            f"Broadcast - sent {summary.sent}/{summary.total}, failed {summary.failed}, "
+            f"retried {summary.retried} in {summary.duration_seconds:.2f}s"
+        )
+        return summary
@@ -0,0 +1,99 @@
+from typing import List
+from src.schemas.weather import (
+    ForecastChangeSchema,
+    ForecastChangeTypeEnum,
+    ForecastTextEnum,
+    RecordSchema,
+    RegionEnum,
+    TimePeriodSchema,
+    rain_severity_map,
+)
+
+
+def severity_of(forecast: ForecastTextEnum | None) -> int:
+    return rain_severity_map.get(forecast, 0) if forecast else 0
+
+
+def classify_change(
+    previous: ForecastTextEnum | None,
+    current: ForecastTextEnum,
+) -> ForecastChangeTypeEnum | None:
+    """
+    :return: the kind of change from `previous` to `current`, None if the rain outlook did not change
+    """
+    previous_severity = severity_of(previous)
+    current_severity = severity_of(current)
+    if previous_severity == current_severity:
+        return None
+    if not previous_severity:
+        return ForecastChangeTypeEnum.RAIN_ONSET
+    if not current_severity:
+        return ForecastChangeTypeEnum.RAIN_CLEARED
+    if current_severity > previous_severity:
+        return ForecastChangeTypeEnum.SEVERITY_ESCALATION
+    return ForecastChangeTypeEnum.SEVERITY_DE_ESCALATION
+
+
+def _overlaps(a: TimePeriodSchema, b: TimePeriodSchema) -> bool:
+    return a.start < b.end and b.start < a.end
+
+
+def _previous_forecast(
+    previous: RecordSchema,
+    period: TimePeriodSchema,
+    region: RegionEnum,
+) -> ForecastTextEnum | None:
+    """
+    Worst forecast of `region` in the periods of `previous` that overlap `period`. Successive forecasts do not
+    share period boundaries, so periods are matched by time rather than by position.
+    """
+    forecasts = [
+        getattr(previous_period.regions, region.value).text
+        for previous_period in previous.periods
+        if _overlaps(previous_period.timePeriod, period)
+    ]
+    return max(forecasts, key=severity_of, default=None)
+
+
+def diff_forecasts(
+    previous: RecordSchema | None,
+    current: RecordSchema,
+) -> List[ForecastChangeSchema]:
+    """
+    Changes in the rain outlook from `previous` to `current`, for the island-wide forecast and for every period
+    and region. Without a previous forecast everything is compared against a dry outlook.
+    """
+    changes: List[ForecastChangeSchema] = []
+
+    general_period = TimePeriodSchema(**current.general.validPeriod.model_dump())
+    previous_general = previous and previous.general.forecast.text
+    change_type = classify_change(previous_general, current.general.forecast.text)
+    if change_type:
+        changes.append(
+            ForecastChangeSchema(
+                period=general_period,
+                change_type=change_type,
+                previous=previous_general,
+                current=current.general.forecast.text,
+            )
+        )
+
+    for period in current.periods:
+        for region in RegionEnum:
+            current_forecast = getattr(period.regions, region.value).text
+            previous_forecast = previous and _previous_forecast(
+                previous, period.timePeriod, region
+            )
+            change_type = classify_change(previous_forecast, current_forecast)
+            if not change_type:
+                continue
+            changes.append(
+                ForecastChangeSchema(
+                    region=region,
+                    period=period.timePeriod,
+                    change_type=change_type,
+                    previous=previous_forecast,
+                    current=current_forecast,
+                )
+            )
+    return changes
@@ -0,0 +1,46 @@
+import functools
+import time
+from typing import Any, Awaitable, Callable
+from telegram import Update
+from telegram.ext import ContextTypes
+from src.core.metrics import metrics
+
+HandlerCallback = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[Any]]
+
+telegram_handler_duration_seconds = metrics.histogram(
+    "telegram_handler_duration_seconds",
+    "Duration of Telegram update handlers, by command or conversation state.",
+    ("handler",),
+)
+telegram_handler_errors_total = metrics.counter(
+    "telegram_handler_errors_total",
+    "Telegram update handlers that raised, by command or conversation state.",
+    ("handler",),
+)
+telegram_tracked_users_total = metrics.counter(
+    "telegram_tracked_users_total",
+    "Users seen by `track_users`, by tracking status.",
+    ("status",),
+)
+
+
+def instrument_handler(callback: HandlerCallback, handler: str) -> HandlerCallback:
+    """
+    Wraps a handler callback to record its duration and errors under `handler`. The return value is passed
+    through so conversation state transitions are unaffected.
+    """
+
+    @functools.wraps(callback)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        start = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except Exception:
+            telegram_handler_errors_total.inc(handler=handler)
+            raise
+        finally:
+            telegram_handler_duration_seconds.observe(
+                time.perf_counter() - start, handler=handler
+            )
+
+    return wrapper
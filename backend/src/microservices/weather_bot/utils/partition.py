@@ -0,0 +1,74 @@
+from typing import List
+from src.core.config import settings
+from src.core.depends import Depends
+from src.repository.broadcast import BroadcastRepository
+
+
+def shard_of(user_id: str, shard_count: int) -> int:
+    """
+    Python side of the partitioning done in SQL by `TelegramRepository`, Telegram user ids are integers.
+    """
+    return int(user_id) % shard_count
+
+
+class BroadcastPartitioner:
+    """
+    Splits `telegram.user_id` into `shard_count` shards and spreads them across the live bot replicas.
+
+    Every replica heartbeats into `bot_instance`. The live instances, sorted by id, own the shards round robin,
+    so when an instance stops heartbeating its shards move to the remaining ones on their next refresh.
+    With `shard_count` of 1 there is nothing to split and no heartbeat is written.
+    """
+
+    def __init__(
+        self,
+        broadcast_repo: BroadcastRepository = Depends(BroadcastRepository),
+        shard_count: int = settings.BROADCAST_SHARD_COUNT,
+        instance_id: str = settings.INSTANCE_ID,
+        instance_ttl_seconds: float = settings.BROADCAST_INSTANCE_TTL_SECONDS,
+    ):
+        self.broadcast_repo = broadcast_repo
+        self.shard_count = shard_count
+        self.instance_id = instance_id
+        self.instance_ttl_seconds = instance_ttl_seconds
+        self.owned_shards: List[int] = [0] if shard_count <= 1 else []
+
+    @property
+    def is_sharded(self) -> bool:
+        return self.shard_count > 1
+
+    def owns(self, user_id: str) -> bool:
+        if not self.is_sharded:
+            return True
+        return shard_of(user_id, self.shard_count) in self.owned_shards
+
+    async def refresh(self) -> bool:
+        """
+        Heartbeats this instance and recomputes the shards it owns.
+
+        :return: True if the owned shards changed
+        """
+        if not self.is_sharded:
+            return False
+        await self.broadcast_repo.heartbeat_instance(self.instance_id)
+        live_instances = await self.broadcast_repo.list_live_instances(
+            self.instance_ttl_seconds
+        )
+        if self.instance_id not in live_instances:
+            live_instances = sorted([*live_instances, self.instance_id])
+        index = live_instances.index(self.instance_id)
+        owned_shards = [
+            shard
+            for shard in range(self.shard_count)
+            if shard % len(live_instances) == index
+        ]
+        changed = owned_shards != self.owned_shards
+        self.owned_shards = owned_shards
+        return changed
+
+    async def leave(self):
+        """
+        Deregisters this instance so the others take over its shards without waiting for the heartbeat TTL.
+        """
+        if self.is_sharded:
+            await self.broadcast_repo.remove_instance(self.instance_id)
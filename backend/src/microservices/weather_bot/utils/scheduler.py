@@ -0,0 +1,90 @@
+import datetime
+from typing import Awaitable, Callable, Iterable, List
+from src.schemas.telegram import TelegramAlertSchedule
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def utc_minute_of_day(alert_start_time: datetime.time, utc_offset_minutes: int) -> int:
+    """
+    Converts a local alert start time into the UTC minute of the day it falls on.
+    """
+    local_minute = alert_start_time.hour * 60 + alert_start_time.minute
+    return (local_minute - utc_offset_minutes) % MINUTES_PER_DAY
+
+
+class AlertScheduler:
+    """
+    In-memory index of subscribers bucketed by the UTC minute of the day their alert window starts.
+
+    Looking up who is due is O(users in the bucket). The index is loaded once with `load` and then kept in sync
+    with `upsert`/`remove` as users change their preferences or (un)subscribe.
+    """
+
+    def __init__(self):
+        # minute of day -> user_id -> schedule
+        self.__buckets: dict[int, dict[str, TelegramAlertSchedule]] = {}
+        self.__user_minute: dict[str, int] = {}
+        # user_id -> schedule, None once removed, recorded while `load` waits on the database
+        self.__changes_during_load: dict[str, TelegramAlertSchedule | None] | None = (
+            None
+        )
+
+    def __len__(self) -> int:
+        return len(self.__user_minute)
+
+    async def load(
+        self,
+        list_schedules: Callable[[], Awaitable[Iterable[TelegramAlertSchedule]]],
+    ):
+        """
+        Replaces the index with the schedules returned by `list_schedules`. The result may have been read before
+        upserts and removes made while the query ran, those are re-applied on top of it.
+        """
+        self.__changes_during_load = {}
+        try:
+            schedules = await list_schedules()
+        finally:
+            changes, self.__changes_during_load = self.__changes_during_load, None
+        self.__buckets = {}
+        self.__user_minute = {}
+        for schedule in schedules:
+            self.__index(schedule)
+        for user_id, schedule in changes.items():
+            if schedule is None:
+                self.__unindex(user_id)
+            else:
+                self.__index(schedule)
+
+    def upsert(self, schedule: TelegramAlertSchedule):
+        if self.__changes_during_load is not None:
+            self.__changes_during_load[schedule.user_id] = schedule
+        self.__index(schedule)
+
+    def remove(self, user_id: str):
+        if self.__changes_during_load is not None:
+            self.__changes_during_load[user_id] = None
+        self.__unindex(user_id)
+
+    def __index(self, schedule: TelegramAlertSchedule):
+        self.__unindex(schedule.user_id)
+        minute = utc_minute_of_day(
+            schedule.alert_start_time, schedule.utc_offset_minutes
+        )
+        self.__buckets.setdefault(minute, {})[schedule.user_id] = schedule
+        self.__user_minute[schedule.user_id] = minute
+
+    def __unindex(self, user_id: str):
+        minute = self.__user_minute.pop(user_id, None)
+        if minute is None:
+            return
+        bucket = self.__buckets[minute]
+        del bucket[user_id]
+        if not bucket:
+            del self.__buckets[minute]
+
+    def due(self, minute: int) -> List[TelegramAlertSchedule]:
+        """
+        :return: schedule of every user whose alert window opens at UTC `minute` of the day
+        """
+        return list(self.__buckets.get(minute, {}).values())
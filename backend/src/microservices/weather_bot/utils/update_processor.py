@@ -0,0 +1,64 @@
+import asyncio
+from typing import Any, Awaitable
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from src.core.config import settings
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates of different chats concurrently, while updates of the same chat run one at a time in the
+    order they were received, so conversation state is never raced.
+
+    The limit enforced by `BaseUpdateProcessor`, `max_pending_updates`, bounds the updates admitted, running or
+    waiting behind an earlier update of their chat. At most `max_running_updates` updates are processed at once
+    and only the oldest update of each chat competes for a slot, so a chat sending many updates cannot hold up
+    the others.
+
+    LINK: https://docs.python-telegram-bot.org/en/stable/telegram.ext.baseupdateprocessor.html
+    """
+
+    def __init__(
+        self,
+        max_running_updates: int = settings.TELEGRAM_CONCURRENT_UPDATES,
+        max_pending_updates: int = settings.TELEGRAM_UPDATE_QUEUE_SIZE,
+    ):
+        super().__init__(max_pending_updates)
+        self.max_running_updates = max_running_updates
+        self.__running = asyncio.Semaphore(max_running_updates)
+        self.__chat_locks: dict[int, asyncio.Lock] = {}
+        # updates holding or waiting on each chat lock, the lock is dropped once none are left
+        self.__chat_updates: dict[int, int] = {}
+
+    def __chat_id(self, update: object) -> int | None:
+        if isinstance(update, Update) and update.effective_chat:
+            return update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]):
+        chat_id = self.__chat_id(update)
+        if chat_id is None:
+            async with self.__running:
+                await coroutine
+            return
+
+        # registered before the first await, updates of a chat queue on its lock in arrival order
+        lock = self.__chat_locks.get(chat_id)
+        if not lock:
+            lock = self.__chat_locks[chat_id] = asyncio.Lock()
+        self.__chat_updates[chat_id] = self.__chat_updates.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                async with self.__running:
+                    await coroutine
+        finally:
+            self.__chat_updates[chat_id] -= 1
+            if not self.__chat_updates[chat_id]:
+                del self.__chat_updates[chat_id]
+                del self.__chat_locks[chat_id]
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
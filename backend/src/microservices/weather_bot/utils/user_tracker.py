@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.config import settings
+from src.core.depends import Depends
+from src.core.sql import async_transaction
+from src.repository.telegram import TelegramRepository
+from src.schemas.telegram import TelegramUserMetadata
+
+
+class UserTrackingStatusEnum(Enum):
+    # seen before with the same metadata, nothing to write
+    UNCHANGED = "unchanged"
+    # seen before but the metadata changed, buffered for the next flush
+    CHANGED = "changed"
+    # not in the cache, caller has to persist the user right away
+    UNKNOWN = "unknown"
+
+
+class UserTracker:
+    """
+    In-process LRU of known Telegram users with a write-behind buffer.
+
+    `track_users` runs on every update, so unchanged users are skipped entirely and changed users are
+    coalesced into one multi-row upsert by `flush`, which is expected to run periodically. Users are known for at
+    most `max_age_seconds`, a row deleted through another process is re-created once its entry expired.
+    """
+
+    def __init__(
+        self,
+        telegram_repo: TelegramRepository = Depends(TelegramRepository),
+        max_size: int = settings.USER_TRACKER_CACHE_SIZE,
+        max_age_seconds: float = settings.USER_TRACKER_MAX_AGE_SECONDS,
+    ):
+        self.telegram_repo = telegram_repo
+        self.max_size = max_size
+        self.max_age_seconds = max_age_seconds
+        # user_id -> (metadata, time.monotonic() when it was persisted)
+        self.__known: OrderedDict[str, Tuple[TelegramUserMetadata, float]] = (
+            OrderedDict()
+        )
+        self.__pending: dict[str, TelegramUserMetadata] = {}
+
+    def __remember(self, metadata: TelegramUserMetadata, persisted_at: float):
+        self.__known[metadata.user_id] = (metadata, persisted_at)
+        self.__known.move_to_end(metadata.user_id)
+        while len(self.__known) > self.max_size:
+            self.__known.popitem(last=False)
+
+    def track(self, metadata: TelegramUserMetadata) -> UserTrackingStatusEnum:
+        known = self.__known.get(metadata.user_id)
+        if known is None:
+            return UserTrackingStatusEnum.UNKNOWN
+        known_metadata, persisted_at = known
+        if time.monotonic() - persisted_at > self.max_age_seconds:
+            del self.__known[metadata.user_id]
+            return UserTrackingStatusEnum.UNKNOWN
+        self.__remember(metadata, persisted_at)
+        if known_metadata == metadata:
+            return UserTrackingStatusEnum.UNCHANGED
+        self.__pending[metadata.user_id] = metadata
+        return UserTrackingStatusEnum.CHANGED
+
+    def mark_persisted(self, metadata: TelegramUserMetadata):
+        """
+        Records a user that was written to the database outside of the write-behind buffer.
+        """
+        self.__remember(metadata, time.monotonic())
+
+    def forget(self, user_ids: List[str]):
+        """
+        Drops users deleted from the database, so their next update persists them again instead of being skipped.
+        """
+        for user_id in user_ids:
+            self.__known.pop(user_id, None)
+
+    @async_transaction
+    async def __upsert(self, users: List[TelegramUserMetadata], session: AsyncSession):
+        await self.telegram_repo.bulk_upsert_telegram_users(users, session=session)
+
+    async def flush(self, *_):
+        """
+        Writes all buffered users in a single transaction. Signature allows use as a job queue callback.
+        """
+        if not self.__pending:
+            return
+        users = list(self.__pending.values())
+        self.__pending.clear()
+        try:
+            await self.__upsert(users)
+        except Exception as e:
+            print(f"User Tracker - flush of {len(users)} users failed: {e}")
+            # keep anything newer that was buffered while flushing
+            for user in users:
+                self.__pending.setdefault(user.user_id, user)
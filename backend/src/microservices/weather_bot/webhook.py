@@ -0,0 +1,97 @@
+import asyncio
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, Request, Response, status
+from telegram import Update
+from telegram.ext import Application
+from src.connectors.weather import weather_api_breaker
+from src.core.config import settings
+from src.core.metrics import metrics_response
+
+
+def create_webhook_app(application: Application) -> FastAPI:
+    """
+    ASGI app that receives updates from Telegram and feeds them into `application.update_queue`.
+
+    Alternative to `run_polling`, updates reach the handlers as soon as Telegram delivers them and several
+    replicas can ingest behind a load balancer. The update queue is bounded, when it stays full for longer than
+    `TELEGRAM_WEBHOOK_ENQUEUE_TIMEOUT_SECONDS` the update is refused with 503 and Telegram redelivers it later.
+
+    LINK: https://core.telegram.org/bots/api#setwebhook
+    LINK: https://docs.python-telegram-bot.org/en/stable/examples.customwebhookbot.html
+    """
+    if not settings.TELEGRAM_WEBHOOK_SECRET:
+        raise ValueError("TELEGRAM_WEBHOOK_SECRET is required in webhook mode")
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI):
+        await application.initialize()
+        if application.post_init:
+            await application.post_init(application)
+        await application.bot.set_webhook(
+            url=f"{settings.TELEGRAM_WEBHOOK_URL}{settings.TELEGRAM_WEBHOOK_PATH}",
+            secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+            allowed_updates=Update.ALL_TYPES,
+            max_connections=settings.TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
+        )
+        await application.start()
+        try:
+            yield
+        finally:
+            # the webhook is left in place, other replicas may still be serving it
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+            await application.shutdown()
+            if application.post_shutdown:
+                await application.post_shutdown(application)
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.post(settings.TELEGRAM_WEBHOOK_PATH)
+    async def telegram_webhook(
+        request: Request,
+        x_telegram_bot_api_secret_token: str | None = Header(default=None),
+    ):
+        if not secrets.compare_digest(
+            x_telegram_bot_api_secret_token or "",
+            settings.TELEGRAM_WEBHOOK_SECRET,
+        ):
+            return Response(status_code=status.HTTP_403_FORBIDDEN)
+
+        try:
+            update = Update.de_json(await request.json(), application.bot)
+        except Exception as e:
+            print(f"Weather Bot Webhook - invalid update: {e}")
+            return Response(status_code=status.HTTP_400_BAD_REQUEST)
+        # processing updates concurrently drains the queue right away, the admitted updates are the backlog
+        processor = application.update_processor
+        if (
+            processor.max_concurrent_updates > 1
+            and processor.current_concurrent_updates >= processor.max_concurrent_updates
+        ):
+            print(
+                "Weather Bot Webhook - too many updates in progress, rejecting update"
+            )
+            return Response(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+        try:
+            await asyncio.wait_for(
+                application.update_queue.put(update),
+                timeout=settings.TELEGRAM_WEBHOOK_ENQUEUE_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            print("Weather Bot Webhook - update queue full, rejecting update")
+            return Response(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response(status_code=status.HTTP_200_OK)
+
+    @app.get("/healthcheck")
+    async def healthcheck():
+        return {
+            "queued_updates": application.update_queue.qsize(),
+            "weather_api": weather_api_breaker.snapshot(),
+        }
+
+    if settings.METRICS_ENABLED:
+        app.add_api_route("/metrics", metrics_response, methods=["GET"])
+
+    return app
@@ -10,7 +10,7 @@ from alembic import context
 
 from src.core.sql import SQLBase
 from src.core.config import settings
-from src.models import telegram, preferences  # noqa: F401
+from src.models import telegram, preferences, broadcast, forecast  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,37 @@
+"""shard forecast broadcast and add bot instance table
+
+Revision ID: 3a9d5e8c7b14
+Revises: c41e7a9b2f60
+Create Date: 2026-10-17 11:26:53.907311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9d5e8c7b14'
+down_revision: Union[str, None] = 'c41e7a9b2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('bot_instance',
+    sa.Column('instance_id', sa.String(), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('instance_id')
+    )
+    op.add_column('forecast_broadcast', sa.Column('shard', sa.Integer(), server_default='0', nullable=False))
+    op.drop_constraint('forecast_broadcast_pkey', 'forecast_broadcast', type_='primary')
+    op.create_primary_key('forecast_broadcast_pkey', 'forecast_broadcast', ['updated_timestamp', 'shard'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('forecast_broadcast_pkey', 'forecast_broadcast', type_='primary')
+    op.execute('DELETE FROM forecast_broadcast WHERE shard <> 0')
+    op.create_primary_key('forecast_broadcast_pkey', 'forecast_broadcast', ['updated_timestamp'])
+    op.drop_column('forecast_broadcast', 'shard')
+    op.drop_table('bot_instance')
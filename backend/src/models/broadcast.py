@@ -0,0 +1,56 @@
+import datetime
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import DateTime, func
+from ..core.sql import SQLBase
+
+
+class ForecastBroadcast(SQLBase):
+    """
+    One row per forecast and shard that has been broadcast, shared by every bot replica.
+    """
+
+    __tablename__ = "forecast_broadcast"
+    updated_timestamp: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+    )
+    # partition of `telegram.user_id`, always 0 unless broadcasts are sharded across replicas
+    shard: Mapped[int] = mapped_column(
+        primary_key=True,
+        server_default="0",
+        insert_default=0,
+    )
+    instance_id: Mapped[str] = mapped_column(nullable=False)
+    claimed_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=False),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class BotInstance(SQLBase):
+    """
+    Live bot replicas, used to split broadcasts between them.
+    """
+
+    __tablename__ = "bot_instance"
+    instance_id: Mapped[str] = mapped_column(primary_key=True)
+    heartbeat_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=False),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class AlertTick(SQLBase):
+    """
+    One row per minute and shard whose scheduled alerts have been sent, shared by every bot replica.
+    """
+
+    __tablename__ = "alert_tick"
+    tick_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+    )
+    shard: Mapped[int] = mapped_column(primary_key=True)
+    instance_id: Mapped[str] = mapped_column(nullable=False)
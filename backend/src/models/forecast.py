@@ -0,0 +1,26 @@
+import datetime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import Date, DateTime, Index, func
+from ..core.sql import SQLBase
+
+
+class ForecastArchive(SQLBase):
+    """
+    Every distinct 24 hour forecast record published by data.gov.sg, one row per `updatedTimestamp`.
+    """
+
+    __tablename__ = "forecast_archive"
+    __table_args__ = (Index("ix_forecast_archive_date", "date"),)
+    updated_timestamp: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+    )
+    date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    # `RecordSchema` as published, JSONB values are compressed by Postgres once they outgrow a page
+    record: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    archived_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=False),
+        nullable=False,
+        server_default=func.now(),
+    )
@@ -1,11 +1,34 @@
 import datetime
+from typing import Optional
 from sqlalchemy.orm import mapped_column, Mapped
-from sqlalchemy import ForeignKey
+from sqlalchemy import Computed, ForeignKey, Index
 from ..core.sql import SQLBase
 
 
+def utc_minute_of_day(column: str) -> Computed:
+    """
+    Generated column with the UTC minute of the day a local alert time falls on, as `utc_minute_of_day` of the
+    alert scheduler. Comparing it to a constant lets the alert window lookup use an index.
+    """
+    local_minute = (
+        f"(EXTRACT(HOUR FROM {column}) * 60 + EXTRACT(MINUTE FROM {column}))::integer"
+    )
+    return Computed(
+        f"(({local_minute} - utc_offset_minutes) % 1440 + 1440) % 1440",
+        persisted=True,
+    )
+
+
 class Preferences(SQLBase):
     __tablename__ = "preferences"
+    __table_args__ = (
+        Index(
+            "ix_preferences_alert_window_utc",
+            "alert_start_utc_minute",
+            "alert_end_utc_minute",
+        ),
+        Index("ix_preferences_region", "region"),
+    )
     id: Mapped[str] = mapped_column(
         ForeignKey("telegram.user_id", ondelete="CASCADE"),
         primary_key=True,
@@ -20,3 +43,18 @@ class Preferences(SQLBase):
         server_default="22:00",
         insert_default="22:00",
     )
+    # alert times are in the user's local time, defaults to Singapore (UTC+8)
+    utc_offset_minutes: Mapped[int] = mapped_column(
+        nullable=False,
+        server_default="480",
+        insert_default=480,
+    )
+    # one of `RegionEnum`, null for all of Singapore
+    region: Mapped[Optional[str]] = mapped_column(nullable=True)
+    # alert window in UTC, kept in sync by the database
+    alert_start_utc_minute: Mapped[int] = mapped_column(
+        utc_minute_of_day("alert_start_time"), init=False
+    )
+    alert_end_utc_minute: Mapped[int] = mapped_column(
+        utc_minute_of_day("alert_end_time"), init=False
+    )
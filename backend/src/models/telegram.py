@@ -1,11 +1,25 @@
 import datetime
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, Index, func, text
 from ..core.sql import SQLBase
 
 
 class Telegram(SQLBase):
     __tablename__ = "telegram"
+    __table_args__ = (
+        # only subscribed users are ever listed for alerts
+        Index(
+            "ix_telegram_user_id_active",
+            "user_id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        # unsubscribed users due for the daily purge
+        Index(
+            "ix_telegram_updated_at_deleted",
+            "updated_at",
+            postgresql_where=text("is_deleted = true"),
+        ),
+    )
     user_id: Mapped[str] = mapped_column(primary_key=True)
     chat_id: Mapped[str] = mapped_column(nullable=False)
     username: Mapped[str] = mapped_column(nullable=True)
@@ -0,0 +1,93 @@
+import datetime
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.sql import async_transaction
+
+
+class BroadcastRepository:
+    @async_transaction
+    async def claim_forecast(
+        self,
+        updated_timestamp: datetime.datetime,
+        instance_id: str,
+        session: AsyncSession,
+        shard: int = 0,
+    ) -> bool:
+        """
+        Atomically claims the broadcast of a forecast to one shard of users.
+
+        :return: True for exactly one caller per `updated_timestamp` and `shard`, across restarts and replicas
+        """
+        statement = """
+            INSERT INTO forecast_broadcast (updated_timestamp, shard, instance_id)
+            VALUES (:updated_timestamp, :shard, :instance_id)
+            ON CONFLICT (updated_timestamp, shard) DO NOTHING
+            RETURNING updated_timestamp
+        """
+        data = await session.execute(
+            text(statement),
+            {
+                "updated_timestamp": updated_timestamp,
+                "shard": shard,
+                "instance_id": instance_id,
+            },
+        )
+        return data.one_or_none() is not None
+
+    @async_transaction
+    async def claim_alert_tick(
+        self,
+        tick_at: datetime.datetime,
+        instance_id: str,
+        session: AsyncSession,
+        shard: int = 0,
+    ) -> bool:
+        """
+        Atomically claims sending the scheduled alerts of the minute `tick_at` to one shard of users.
+        """
+        statement = """
+            INSERT INTO alert_tick (tick_at, shard, instance_id)
+            VALUES (:tick_at, :shard, :instance_id)
+            ON CONFLICT (tick_at, shard) DO NOTHING
+            RETURNING tick_at
+        """
+        data = await session.execute(
+            text(statement),
+            {"tick_at": tick_at, "shard": shard, "instance_id": instance_id},
+        )
+        return data.one_or_none() is not None
+
+    @async_transaction
+    async def heartbeat_instance(self, instance_id: str, session: AsyncSession):
+        statement = """
+            INSERT INTO bot_instance (instance_id, heartbeat_at)
+            VALUES (:instance_id, CURRENT_TIMESTAMP)
+            ON CONFLICT (instance_id) DO UPDATE SET heartbeat_at = CURRENT_TIMESTAMP
+        """
+        await session.execute(text(statement), {"instance_id": instance_id})
+
+    @async_transaction
+    async def list_live_instances(
+        self,
+        ttl_seconds: float,
+        session: AsyncSession,
+    ) -> List[str]:
+        """
+        :return: ids of instances with a heartbeat in the last `ttl_seconds`, sorted
+        """
+        statement = """
+            SELECT instance_id FROM bot_instance
+            WHERE heartbeat_at > CURRENT_TIMESTAMP - make_interval(secs => :ttl_seconds)
+            ORDER BY instance_id
+        """
+        data = await session.execute(text(statement), {"ttl_seconds": ttl_seconds})
+        return list(data.scalars().all())
+
+    @async_transaction
+    async def remove_instance(self, instance_id: str, session: AsyncSession):
+        statement = """
+            DELETE FROM bot_instance WHERE instance_id = :instance_id
+        """
+        await session.execute(text(statement), {"instance_id": instance_id})
@@ -0,0 +1,90 @@
+import datetime
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.sql import async_engine, async_read
+from src.models.forecast import ForecastArchive as ForecastArchiveDAO
+from src.schemas.weather import RecordSchema
+
+
+class ForecastArchiveRepository:
+    async def bulk_insert_records(
+        self, records: List[RecordSchema]
+    ) -> List[datetime.datetime]:
+        """
+        Archives `records` with a single COPY into a staging table, then moves them into `forecast_archive` in one
+        statement. Records that were archived before are skipped.
+
+        :return: updatedTimestamp of the records that were new
+        """
+        if not records:
+            return []
+        async with async_engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            # COPY is only exposed by the asyncpg connection itself
+            driver_connection = raw_connection.driver_connection
+            async with driver_connection.transaction():
+                await driver_connection.execute(
+                    """
+                    CREATE TEMP TABLE forecast_archive_staging
+                    (LIKE forecast_archive INCLUDING DEFAULTS) ON COMMIT DROP
+                    """
+                )
+                await driver_connection.copy_records_to_table(
+                    "forecast_archive_staging",
+                    records=[
+                        (record.updatedTimestamp, record.date, record.model_dump_json())
+                        for record in records
+                    ],
+                    columns=["updated_timestamp", "date", "record"],
+                )
+                rows = await driver_connection.fetch(
+                    """
+                    INSERT INTO forecast_archive (updated_timestamp, date, record)
+                    SELECT updated_timestamp, date, record FROM forecast_archive_staging
+                    ON CONFLICT (updated_timestamp) DO NOTHING
+                    RETURNING updated_timestamp
+                    """
+                )
+        return [row["updated_timestamp"] for row in rows]
+
+    @async_read
+    async def list_records(
+        self,
+        date_from: datetime.date,
+        date_to: datetime.date,
+        session: AsyncSession,
+    ) -> List[RecordSchema]:
+        """
+        Archived records published from `date_from` up to and including `date_to`, oldest first.
+        """
+        data = await session.execute(
+            select(ForecastArchiveDAO.record)
+            .where(
+                ForecastArchiveDAO.date >= date_from,
+                ForecastArchiveDAO.date <= date_to,
+            )
+            .order_by(ForecastArchiveDAO.updated_timestamp)
+        )
+        return [RecordSchema.model_validate(record) for record in data.scalars()]
+
+    @async_read
+    async def get_latest_record_before(
+        self,
+        updated_timestamp: datetime.datetime,
+        session: AsyncSession,
+    ) -> RecordSchema | None:
+        """
+        The archived record published right before `updated_timestamp`.
+        """
+        data = await session.execute(
+            select(ForecastArchiveDAO.record)
+            .where(ForecastArchiveDAO.updated_timestamp < updated_timestamp)
+            .order_by(ForecastArchiveDAO.updated_timestamp.desc())
+            .limit(1)
+        )
+        record = data.scalar_one_or_none()
+        if not record:
+            return None
+        return RecordSchema.model_validate(record)
@@ -1,28 +1,58 @@
 import datetime
+from typing import List
 from sqlalchemy import text, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..schemas.preferences import PreferencesRepositorySchema
+from ..schemas.weather import RegionEnum
 from ..models.preferences import Preferences as PreferencesDAO
-from ..core.sql import async_session, async_transaction
+from ..core.cache import CacheBackend, cache_backend
 from ..core.depends import Depends
+from ..core.sql import after_commit, async_read, async_transaction
 
 
 class PreferencesRepository:
-    def __init__(self, session: AsyncSession = Depends(async_session)):
-        self.session = session
+    def __init__(self, cache: CacheBackend = Depends(cache_backend)):
+        self.cache = cache
+
+    def __cache_key(self, user_id: str) -> str:
+        return f"preferences:{user_id}"
 
     def __dao_to_dto(self, dao: PreferencesDAO):
         return PreferencesRepositorySchema(
             id=dao.id,
             alert_start_time=dao.alert_start_time,
             alert_end_time=dao.alert_end_time,
+            utc_offset_minutes=dao.utc_offset_minutes,
+            region=dao.region,
         )
 
     async def get_user_preference(
         self, user_id: str
     ) -> PreferencesRepositorySchema | None:
-        preferences_data = await self.session.execute(
+        cached = await self.cache.get(self.__cache_key(user_id))
+        if cached:
+            return PreferencesRepositorySchema.model_validate_json(cached)
+
+        preferences = await self.__get_user_preference(user_id)
+        if preferences:
+            await self.cache.set(
+                self.__cache_key(user_id),
+                preferences.model_dump_json(),
+            )
+        return preferences
+
+    async def invalidate_cached_preferences(self, user_ids: List[str]):
+        """
+        Removes cached preferences of users whose rows were deleted, e.g. cascaded from a purged Telegram user.
+        """
+        await self.cache.delete(*[self.__cache_key(user_id) for user_id in user_ids])
+
+    @async_read
+    async def __get_user_preference(
+        self, user_id: str, session: AsyncSession
+    ) -> PreferencesRepositorySchema | None:
+        preferences_data = await session.execute(
             select(PreferencesDAO).where(PreferencesDAO.id == user_id)
         )
         preferences = preferences_data.scalar_one_or_none()
@@ -30,29 +60,6 @@ class PreferencesRepository:
             return None
         return self.__dao_to_dto(preferences)
 
-    async def create_preferences(
-        self,
-        user_id: str,
-        session: AsyncSession,
-        alert_start_time: datetime.time | str,
-        alert_end_time: datetime.time | str,
-    ):
-        preferences = PreferencesRepositorySchema(
-            id=user_id,
-            alert_start_time=alert_start_time,
-            alert_end_time=alert_end_time,
-        )
-
-        statement = """
-            INSERT INTO preferences (id, alert_start_time, alert_end_time)
-            VALUES (:id, :alert_start_time, :alert_end_time)
-        """
-
-        await session.execute(
-            text(statement),
-            preferences.model_dump(),
-        )
-
     # TODO: Check if start time is same as end time
     @async_transaction
     async def update_preferences(
@@ -61,18 +68,39 @@ class PreferencesRepository:
         alert_start_time: datetime.time | str,
         alert_end_time: datetime.time | str,
         session: AsyncSession,
+        utc_offset_minutes: int | None = None,
     ):
         statement = """
             UPDATE preferences
-            SET alert_start_time = :alert_start_time, alert_end_time = :alert_end_time
+            SET alert_start_time = :alert_start_time, alert_end_time = :alert_end_time,
+            utc_offset_minutes = COALESCE(:utc_offset_minutes, utc_offset_minutes)
             WHERE id = :id
         """
         params = PreferencesRepositorySchema(
             id=id,
             alert_start_time=alert_start_time,
             alert_end_time=alert_end_time,
+            utc_offset_minutes=utc_offset_minutes,
         )
         await session.execute(
             text(statement),
             params=params.model_dump(),
         )
+        after_commit(session, lambda: self.cache.delete(self.__cache_key(id)))
+
+    @async_transaction
+    async def update_region(
+        self,
+        id: str,
+        region: RegionEnum | None,
+        session: AsyncSession,
+    ):
+        statement = """
+            UPDATE preferences SET region = :region
+            WHERE id = :id
+        """
+        await session.execute(
+            text(statement),
+            params={"id": id, "region": region and region.value},
+        )
+        after_commit(session, lambda: self.cache.delete(self.__cache_key(id)))
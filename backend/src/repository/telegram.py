@@ -1,25 +1,47 @@
 import datetime
-from typing import List
-
-# from sqlalchemy import text, select, and_
-from sqlalchemy import text, select
-
+from typing import AsyncIterator, List
+from sqlalchemy import (
+    BigInteger,
+    and_,
+    cast,
+    false,
+    literal_column,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.sql import async_transaction, async_session
+from src.core.cache import CacheBackend, cache_backend
+from src.core.config import settings
+from src.core.depends import Depends
+from src.core.sql import (
+    after_commit,
+    async_engine,
+    async_read,
+    async_session,
+    async_transaction,
+)
 from src.schemas.preferences import PreferencesRepositorySchema
+from src.schemas.weather import RegionEnum
 from src.schemas.telegram import (
     TelegramRepositorySchema,
+    TelegramAlertSchedule,
     TelegramPreferenceRepositorySchema,
+    TelegramRecipient,
+    TelegramUserMetadata,
 )
 from src.models.telegram import Telegram as TelegramDAO
 from src.models.preferences import Preferences as PreferencesDAO
-from src.core.depends import Depends
 
 
 class TelegramRepository:
-    def __init__(self, session: AsyncSession = Depends(async_session)):
-        self.session = session
+    def __init__(self, cache: CacheBackend = Depends(cache_backend)):
+        self.cache = cache
+
+    def __cache_key(self, user_id: str) -> str:
+        return f"telegram:user:{user_id}"
 
     def __dao_to_dto(self, dao: TelegramDAO):
         return TelegramRepositorySchema(
@@ -43,11 +65,26 @@ class TelegramRepository:
                 id=preference_dao.id,
                 alert_start_time=preference_dao.alert_start_time,
                 alert_end_time=preference_dao.alert_end_time,
+                utc_offset_minutes=preference_dao.utc_offset_minutes,
+                region=preference_dao.region,
             ),
         )
 
     async def get_telegram_user(self, user_id: str) -> TelegramRepositorySchema | None:
-        user_data = await self.session.execute(
+        cached = await self.cache.get(self.__cache_key(user_id))
+        if cached:
+            return TelegramRepositorySchema.model_validate_json(cached)
+
+        user = await self.__get_telegram_user(user_id)
+        if user:
+            await self.cache.set(self.__cache_key(user_id), user.model_dump_json())
+        return user
+
+    @async_read
+    async def __get_telegram_user(
+        self, user_id: str, session: AsyncSession
+    ) -> TelegramRepositorySchema | None:
+        user_data = await session.execute(
             select(TelegramDAO).where(TelegramDAO.user_id == user_id)
         )
         user = user_data.scalar_one_or_none()
@@ -55,13 +92,32 @@ class TelegramRepository:
             return None
         return self.__dao_to_dto(user)
 
+    def __within_alert_window(self, now: datetime.datetime):
+        """
+        Filters preferences whose alert window contains the minute of `now`, against the windows stored in UTC,
+        so both bounds are compared to a constant through `ix_preferences_alert_window_utc`.
+
+        A window where start > end crosses midnight UTC, e.g. 07:00 - 22:00 in Singapore is 23:00 - 14:00 UTC.
+        """
+        minute = now.hour * 60 + now.minute
+        start = PreferencesDAO.alert_start_utc_minute
+        end = PreferencesDAO.alert_end_utc_minute
+        return or_(
+            and_(start <= end, start <= minute, end >= minute),
+            and_(start > end, or_(start <= minute, end >= minute)),
+        )
+
     @async_transaction
     async def list_subscribed_users_within_timeframe(
         self,
         session: AsyncSession,
+        now: datetime.datetime | None = None,
     ) -> List[TelegramPreferenceRepositorySchema]:
+        """
+        :param now: naive UTC datetime to check alert windows against, defaults to current time
+        """
         # transaction is required here to explicity execute join statement
-        # now = datetime.datetime.now().time()
+        now = now or datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
         data = await session.execute(
             select(
                 TelegramDAO,
@@ -73,13 +129,8 @@ class TelegramRepository:
                 onclause=TelegramDAO.user_id == PreferencesDAO.id,
             )
             .where(
-                # TODO: Uncomment this when user timezone is supported.
                 TelegramDAO.is_deleted == False,  # noqa: E712
-                # and_(
-                #     TelegramDAO.is_deleted == False,  # noqa: E712
-                #     now >= PreferencesDAO.alert_start_time,
-                #     now <= PreferencesDAO.alert_end_time,
-                # )
+                self.__within_alert_window(now),
             )
         )
         return [
@@ -90,7 +141,143 @@ class TelegramRepository:
             for telegram, preference in data.tuples().all()
         ]
 
-    async def upsert_telegram_user(
+    def __in_regions(self, regions: List[RegionEnum | None]):
+        """
+        Filters preferences by region, `None` matches users alerted for all of Singapore.
+        """
+        named_regions = [region.value for region in regions if region]
+        conditions = []
+        if named_regions:
+            conditions.append(PreferencesDAO.region.in_(named_regions))
+        if None in regions:
+            conditions.append(PreferencesDAO.region.is_(None))
+        return or_(false(), *conditions)
+
+    def __subscribed_recipients_statement(
+        self,
+        now: datetime.datetime | None,
+        shards: List[int] | None = None,
+        shard_count: int = 1,
+        regions: List[RegionEnum | None] | None = None,
+    ):
+        now = now or datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        statement = (
+            select(TelegramDAO.user_id, TelegramDAO.chat_id)
+            .join_from(
+                from_=TelegramDAO,
+                target=PreferencesDAO,
+                onclause=TelegramDAO.user_id == PreferencesDAO.id,
+            )
+            .where(
+                TelegramDAO.is_deleted == False,  # noqa: E712
+                self.__within_alert_window(now),
+            )
+        )
+        if shards is not None and shard_count > 1:
+            # must match `shard_of` in the weather bot partitioner
+            shard = cast(TelegramDAO.user_id, BigInteger) % shard_count
+            statement = statement.where(shard.in_(shards))
+        if regions is not None:
+            statement = statement.where(self.__in_regions(regions))
+        return statement
+
+    async def list_alert_schedules(
+        self, user_ids: List[str] | None = None
+    ) -> List[TelegramAlertSchedule]:
+        """
+        Alert start time of every subscribed user, for building the in-memory alert schedule.
+
+        :param user_ids: only list these users, e.g. to check schedules that are due against the database
+        """
+        statement = (
+            select(
+                TelegramDAO.user_id,
+                TelegramDAO.chat_id,
+                PreferencesDAO.alert_start_time,
+                PreferencesDAO.utc_offset_minutes,
+                PreferencesDAO.region,
+            )
+            .join_from(
+                from_=TelegramDAO,
+                target=PreferencesDAO,
+                onclause=TelegramDAO.user_id == PreferencesDAO.id,
+            )
+            .where(TelegramDAO.is_deleted == False)  # noqa: E712
+        )
+        if user_ids is not None:
+            statement = statement.where(TelegramDAO.user_id.in_(user_ids))
+        async with async_engine.connect() as connection:
+            result = await connection.execute(statement)
+            return list(map(TelegramAlertSchedule._make, result.tuples()))
+
+    async def stream_subscribed_users_within_timeframe(
+        self,
+        now: datetime.datetime | None = None,
+        batch_size: int = settings.DB_STREAM_BATCH_SIZE,
+        shards: List[int] | None = None,
+        shard_count: int = 1,
+        regions: List[RegionEnum | None] | None = None,
+    ) -> AsyncIterator[List[TelegramRecipient]]:
+        """
+        Lean, streaming counterpart of `list_subscribed_users_within_timeframe` for bulk reads.
+
+        Selects only the columns needed to message a user and maps rows straight into `TelegramRecipient` tuples,
+        skipping ORM identity tracking and pydantic validation. Rows are read through a server-side cursor
+        `batch_size` at a time, so memory stays flat regardless of the number of subscribers. The cursor, and its
+        connection, stay open until the consumer is done iterating.
+
+        :param now: naive UTC datetime to check alert windows against, defaults to current time
+        :param shards: only stream users whose `user_id % shard_count` is in `shards`
+        :param regions: only stream users who chose one of `regions`, `None` for users without a region
+        """
+        statement = self.__subscribed_recipients_statement(
+            now, shards, shard_count, regions
+        ).execution_options(yield_per=batch_size)
+        async with async_session() as session:
+            async with session.begin():
+                result = await session.stream(statement)
+                async for partition in result.partitions():
+                    yield list(map(TelegramRecipient._make, partition))
+
+    def __upsert_users_with_preferences_statement(
+        self, users: List[TelegramUserMetadata]
+    ):
+        """
+        Upserts `telegram` rows and inserts default `preferences` for them in a single statement.
+
+        `preferences` is filled from the rows returned by the upsert CTE and relies on the column server defaults,
+        an existing preference is left untouched. `is_new` is true for users that were inserted rather than updated.
+        """
+        upsert = insert(TelegramDAO).values([user._asdict() for user in users])
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[TelegramDAO.user_id],
+            set_={
+                "chat_id": upsert.excluded.chat_id,
+                "username": upsert.excluded.username,
+                "first_name": upsert.excluded.first_name,
+                "last_name": upsert.excluded.last_name,
+            },
+        ).returning(
+            TelegramDAO.user_id,
+            # xmax is only set on rows that already existed and were updated
+            literal_column("xmax = 0").label("is_new"),
+        )
+        upserted = upsert.cte("upserted")
+        default_preferences = (
+            insert(PreferencesDAO)
+            .from_select(
+                [PreferencesDAO.id],
+                select(upserted.c.user_id),
+                include_defaults=False,
+            )
+            .on_conflict_do_nothing(index_elements=[PreferencesDAO.id])
+            .cte("default_preferences")
+        )
+        return select(upserted.c.user_id, upserted.c.is_new).add_cte(
+            default_preferences
+        )
+
+    async def upsert_telegram_user_with_preferences(
         self,
         user_id: str,
         chat_id: str,
@@ -98,25 +285,35 @@ class TelegramRepository:
         first_name: str | None,
         last_name: str | None,
         session: AsyncSession,
-    ):
-        statement = """
-            INSERT INTO telegram (user_id, chat_id, username, first_name, last_name)
-            VALUES (:user_id, :chat_id, :username, :first_name, :last_name)
-            ON CONFLICT (user_id) DO UPDATE
-            SET chat_id = :chat_id, username = :username, first_name = :first_name, last_name = :last_name
+    ) -> bool:
         """
-        params = TelegramRepositorySchema(
-            user_id=user_id,
-            chat_id=chat_id,
-            username=username,
-            first_name=first_name,
-            last_name=last_name,
-        ).model_dump(exclude=["updated_at", "is_deleted"])
+        Creates or updates the user together with default preferences in one round trip.
 
-        await session.execute(
-            text(statement),
-            params,
+        :return: True if the user did not exist before
+        """
+        statement = self.__upsert_users_with_preferences_statement(
+            [TelegramUserMetadata(user_id, chat_id, username, first_name, last_name)]
         )
+        data = await session.execute(statement)
+        after_commit(session, lambda: self.cache.delete(self.__cache_key(user_id)))
+        return bool(data.one().is_new)
+
+    async def bulk_upsert_telegram_users(
+        self,
+        users: List[TelegramUserMetadata],
+        session: AsyncSession,
+        chunk_size: int = 1000,
+    ):
+        """
+        Multi-row variant of `upsert_telegram_user_with_preferences`, one statement per `chunk_size` users.
+        """
+        for i in range(0, len(users), chunk_size):
+            statement = self.__upsert_users_with_preferences_statement(
+                users[i : i + chunk_size]
+            )
+            await session.execute(statement)
+        keys = [self.__cache_key(user.user_id) for user in users]
+        after_commit(session, lambda: self.cache.delete(*keys))
 
     @async_transaction
     async def update_is_deleted_user(
@@ -140,22 +337,40 @@ class TelegramRepository:
             text(statement),
             params,
         )
+        after_commit(session, lambda: self.cache.delete(self.__cache_key(user_id)))
 
     @async_transaction
-    async def hard_delete_telegram_users(self, session: AsyncSession):
-        # To be used in a cron job for database cleanup
-        statement = """
-            DELETE FROM telegram
-            WHERE is_deleted = :is_deleted
-            AND updated_at < :updated_at
+    async def hard_delete_telegram_users(
+        self,
+        updated_before: datetime.datetime,
+        batch_size: int,
+        session: AsyncSession,
+    ) -> List[str]:
         """
+        Deletes up to `batch_size` users that unsubscribed before `updated_before`, their preferences cascade.
 
-        params = {
-            "is_deleted": True,
-            "updated_at": datetime.datetime.now() - datetime.timedelta(days=30),
-        }
+        Candidates are found through the partial index on unsubscribed users, oldest first. Rows locked by live
+        traffic are skipped and picked up by a later batch, so the purge never waits on an interactive user.
+        To be used in a cron job for database cleanup, called repeatedly until it returns fewer than `batch_size`.
 
-        await session.execute(
+        :return: user_id of the deleted users
+        """
+        statement = """
+            DELETE FROM telegram
+            WHERE user_id IN (
+                SELECT user_id FROM telegram
+                WHERE is_deleted = true AND updated_at < :updated_before
+                ORDER BY updated_at
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING user_id
+        """
+        data = await session.execute(
             text(statement),
-            params,
+            {"updated_before": updated_before, "batch_size": batch_size},
         )
+        user_ids = list(data.scalars())
+        keys = [self.__cache_key(user_id) for user_id in user_ids]
+        after_commit(session, lambda: self.cache.delete(*keys))
+        return user_ids
@@ -2,11 +2,21 @@ import datetime
 from typing import Optional
 from pydantic import BaseModel
 
+from .weather import RegionEnum
+
+# must match the server defaults of the preferences table
+DEFAULT_ALERT_START_TIME = datetime.time(7, 0)
+DEFAULT_ALERT_END_TIME = datetime.time(22, 0)
+DEFAULT_UTC_OFFSET_MINUTES = 480
+
 
 class PreferencesRepositorySchema(BaseModel):
     id: str
     alert_start_time: Optional[datetime.time] = None
     alert_end_time: Optional[datetime.time] = None
+    utc_offset_minutes: Optional[int] = None
+    # None means all of Singapore, alerted on the general forecast
+    region: Optional[RegionEnum] = None
 
     # @field_validator("alert_start_time")
     # def convert_alert_start_time(value):
@@ -1,5 +1,5 @@
 import datetime
-from typing import Callable, Optional
+from typing import Callable, NamedTuple, Optional
 from pydantic import BaseModel
 from enum import Enum
 
@@ -13,13 +13,20 @@ class TelegramWeatherCommandsEnum(Enum):
     UNSUBSCRIBE = "unsubscribe"
 
 
+class TelegramUpdateModeEnum(Enum):
+    POLLING = "polling"
+    WEBHOOK = "webhook"
+
+
 class TelegramWeatherConfigEnum(Enum):
     ALERT_START_TIME = "Start time of alerts"
     ALERT_END_TIME = "End time of alerts"
+    REGION = "Region of alerts"
 
 
 class TelegramWeatherConversationStatesEnum(Enum):
     ALERT_TIME = "Alert time"
+    REGION = "Region"
     SELECTING_NOTIFICATION_OPTION = "Selecting notification option"
     FALLBACK = "Fallback"
     END_CONVERSATION = "See ya!"
@@ -40,7 +47,46 @@ class TelegramPreferenceRepositorySchema(BaseModel):
     preference: PreferencesRepositorySchema
 
 
+class TelegramRecipient(NamedTuple):
+    """
+    Lightweight, unvalidated row for bulk reads where a pydantic model per row is too costly.
+    """
+
+    user_id: str
+    chat_id: str
+
+
+class TelegramAlertSchedule(NamedTuple):
+    user_id: str
+    chat_id: str
+    alert_start_time: datetime.time
+    utc_offset_minutes: int
+    region: Optional[str] = None
+
+
+class TelegramUserMetadata(NamedTuple):
+    user_id: str
+    chat_id: str
+    username: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+
+
 class TelegramAddJobSchema(BaseModel):
     callback: Callable
     interval: float | datetime.timedelta
     first: Optional[float | datetime.timedelta] = None
+
+
+class TelegramPurgeSummarySchema(BaseModel):
+    purged: int = 0
+    batches: int = 0
+    duration_seconds: float = 0
+
+
+class TelegramBroadcastSummarySchema(BaseModel):
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    duration_seconds: float = 0
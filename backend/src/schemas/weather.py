@@ -30,6 +30,15 @@ class ForecastTextEnum(Enum):
     HTSGW = "Heavy Thundery Showers with Gusty Winds"
 
 
+class RegionEnum(Enum):
+    # values match the keys of `RegionSchema`
+    WEST = "west"
+    EAST = "east"
+    CENTRAL = "central"
+    SOUTH = "south"
+    NORTH = "north"
+
+
 rain_forecast_list = [
     ForecastTextEnum.LR,
     ForecastTextEnum.MR,
@@ -43,6 +52,27 @@ rain_forecast_list = [
     ForecastTextEnum.HTSGW,
 ]
 
+# higher is worse, forecasts without rain rank 0
+rain_severity_map = {
+    ForecastTextEnum.LR: 1,
+    ForecastTextEnum.LS: 1,
+    ForecastTextEnum.PS: 1,
+    ForecastTextEnum.MR: 2,
+    ForecastTextEnum.S: 2,
+    ForecastTextEnum.HR: 3,
+    ForecastTextEnum.HS: 3,
+    ForecastTextEnum.TS: 4,
+    ForecastTextEnum.HTS: 5,
+    ForecastTextEnum.HTSGW: 6,
+}
+
+
+class ForecastChangeTypeEnum(Enum):
+    RAIN_ONSET = "rain_onset"
+    RAIN_CLEARED = "rain_cleared"
+    SEVERITY_ESCALATION = "severity_escalation"
+    SEVERITY_DE_ESCALATION = "severity_de_escalation"
+
 
 ################## Start of Primitive Data ##################
 class TemperatureSchema(BaseModel):
@@ -113,6 +143,15 @@ class SegmentedPeriodSchema(BaseModel):
     regions: RegionSchema
 
 
+class ForecastChangeSchema(BaseModel):
+    # None for the island-wide forecast
+    region: Optional[RegionEnum] = None
+    period: TimePeriodSchema
+    change_type: ForecastChangeTypeEnum
+    previous: Optional[ForecastTextEnum] = None
+    current: ForecastTextEnum
+
+
 class RecordSchema(BaseModel):
     date: datetime.date
     updatedTimestamp: datetime.datetime
@@ -123,6 +162,7 @@ class RecordSchema(BaseModel):
 
 class ListRecordSchema(BaseModel):
     records: List[RecordSchema]
+    paginationToken: Optional[str] = None
 
 
 class TwentyFourHourSchema(BaseModel):
@@ -137,7 +177,52 @@ class TwentyFourHourSchema(BaseModel):
 
 
 class TwentyFourHourParams(BaseModel):
-    date: str
+    # omit to get the latest published forecast
+    date: Optional[str] = None
+    paginationToken: Optional[str] = None
+
+
+class DailyForecastSchema(BaseModel):
+    code: str
+    text: str
+    summary: Optional[str] = None
+
+
+class DayForecastSchema(BaseModel):
+    timestamp: datetime.datetime
+    day: str
+    temperature: TemperatureSchema
+    relativeHumidity: HumiditySchema
+    forecast: DailyForecastSchema
+    wind: WindSchema
+
+
+class FourDayRecordSchema(BaseModel):
+    date: datetime.date
+    updatedTimestamp: datetime.datetime
+    timestamp: datetime.datetime
+    forecasts: List[DayForecastSchema]
+
+
+class FourDayListRecordSchema(BaseModel):
+    records: List[FourDayRecordSchema]
+    paginationToken: Optional[str] = None
+
+
+class FourDayOutlookSchema(BaseModel):
+    code: int
+    data: FourDayListRecordSchema
+    errorMsg: Optional[str] = None
+
+    model_config = ConfigDict(
+        extra="allow",
+    )
+
+
+class FourDayOutlookParams(BaseModel):
+    # omit to get the latest published outlook
+    date: Optional[str] = None
+    paginationToken: Optional[str] = None
 
 
 # Example JSON response